@@ -0,0 +1,149 @@
+"""
+HTTP client layer shared by check_analytics_ready.py and demo_real_working.py.
+Keep-alive connections (one per host per thread), resolved once per sweep,
+with gzip bodies decoded and one retry when the server drops an idle socket;
+JSON encoding (orjson when installed) and the worker pool for fan-outs.
+"""
+import functools
+import gzip
+import http.client
+import json
+import socket
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+    dumps = orjson.dumps
+    loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def dumps(obj):
+        return json.dumps(obj).encode()
+    loads = json.loads
+
+# Request headers are fixed per method, so the dicts are built once.
+GET_HEADERS = {"Accept-Encoding": "gzip"}
+POST_JSON_HEADERS = {"Accept-Encoding": "gzip", "Content-Type": "application/json"}
+
+def json_body(data):
+    """Request body for a dict, or an already-serialized JSON body (bytes)."""
+    return data if isinstance(data, bytes) else dumps(data)
+
+# Call clear_dns_cache() to re-resolve, e.g. at the start of every sweep of a
+# long-running probe, so a deployment whose address changed is picked up.
+@functools.lru_cache(maxsize=None)
+def _resolve(host, port):
+    return socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+
+def clear_dns_cache():
+    _resolve.cache_clear()
+
+def _create_connection(address, timeout, source_address=None):
+    """socket.create_connection(), but resolving each host only once.
+
+    The first request pays for the lookup; every connection opened afterwards
+    (one per worker thread) reuses the cached addresses, which matters once
+    the scripts point at a remote deployment.
+    """
+    err = None
+    for family, type_, proto, _, sockaddr in _resolve(*address):
+        sock = socket.socket(family, type_, proto)
+        try:
+            sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            err = e
+            sock.close()
+    raise err if err is not None else OSError(f"no addresses for {address[0]}")
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context():
+    context = ssl.create_default_context()
+    context.set_alpn_protocols(["http/1.1"])
+    return context
+
+class _HTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection that opens its socket with _create_connection."""
+
+    def connect(self):
+        self.sock = _create_connection((self.host, self.port), self.timeout, self.source_address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+class _HTTPSConnection(_HTTPConnection):
+    """_HTTPConnection wrapped in TLS, for https:// deployments."""
+
+    default_port = http.client.HTTPS_PORT
+
+    def connect(self):
+        super().connect()
+        self.sock = _ssl_context().wrap_socket(self.sock, server_hostname=self.host)
+
+def new_connection(parts, timeout):
+    """Fresh (not pooled) connection to the host of urlsplit() parts."""
+    cls = _HTTPSConnection if parts.scheme == "https" else _HTTPConnection
+    return cls(parts.hostname, parts.port, timeout=timeout)
+
+# Keep-alive connections, one per host per worker thread, reused across calls.
+_local = threading.local()
+
+def _connection(parts, timeout):
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(parts.netloc)
+    if conn is None:
+        conn = conns[parts.netloc] = new_connection(parts, timeout)
+    return conn
+
+@functools.lru_cache(maxsize=None)
+def _split(url):
+    """Parse url once into (parts, request path); callers reuse the same URLs."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return parts, path
+
+def request(method, url, body=None, headers=GET_HEADERS, timeout=5.0):
+    """Send one request on this thread's keep-alive connection to url's host.
+
+    Returns (status, body bytes, headers), with gzip bodies already decoded.
+    Connection errors propagate; timeout applies when the connection is opened.
+    """
+    parts, path = _split(url)
+    conn = _connection(parts, timeout)
+    for attempt in range(2):
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            r = conn.getresponse()
+            data = r.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # The server closed an idle keep-alive socket; retry once on a fresh one.
+            conn.close()
+            if not reused or attempt:
+                raise
+            continue
+        except Exception:
+            conn.close()
+            raise
+        if r.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return r.status, data, r.headers
+
+# Fan-outs share one set of worker threads, so each thread's keep-alive
+# connection survives from one phase to the next. HTTP/1.1 cannot multiplex,
+# so the pool is sized to the widest fan-out: one connection per request.
+MAX_IN_FLIGHT = 16
+_pool = None
+
+def executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT)
+    return _pool
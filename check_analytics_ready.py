@@ -1,53 +1,125 @@
 #!/usr/bin/env python3
 """Check all analytics/dashboard endpoints and deployment readiness."""
-import urllib.request
-import urllib.error
-import json
+import argparse
+import re
 import sys
+import time
+from concurrent.futures import wait
+from urllib.parse import urlsplit
+
+from api_client import (GET_HEADERS, POST_JSON_HEADERS, clear_dns_cache, dumps, executor,
+                        json_body, loads, new_connection, request)
+from fixtures import PAYLOAD_CUO
 
 BASE = "http://127.0.0.1:5000"
-TIMEOUT = 5
+TIMEOUT = 1.0        # per request (connect and each read)
+PHASE_BUDGET = 2.0   # wall-clock cap for one concurrent fan-out
+LIVENESS_TIMEOUT = 0.5
 
-def get(url):
-    req = urllib.request.Request(url)
+# The seed prediction body is constant, so it is serialized once at import.
+_SEED_PAYLOAD = dumps({**PAYLOAD_CUO, "nanoparticle_id": "Check_CuO"})
+
+def is_live(base=BASE):
+    """Liveness probe: one quick GET /ping before running the full sweep."""
+    conn = new_connection(urlsplit(base), LIVENESS_TIMEOUT)
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-            return r.status, r.read().decode()
-    except urllib.error.HTTPError as e:
-        return e.code, e.read().decode() if e.fp else ""
-    except Exception as e:
-        return None, str(e)
+        conn.request("GET", "/ping")
+        return conn.getresponse().status == 200
+    except Exception:
+        return False
+    finally:
+        conn.close()
 
-def post(url, data):
-    req = urllib.request.Request(url, data=json.dumps(data).encode(), method="POST",
-                                  headers={"Content-Type": "application/json"})
+def _request(method, url, body=None, headers=GET_HEADERS):
+    """api_client.request(), with failures returned as (None, error text, None)."""
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
-            return r.status, r.read().decode()
-    except urllib.error.HTTPError as e:
-        return e.code, e.read().decode() if e.fp else ""
+        return request(method, url, body, headers, timeout=TIMEOUT)
     except Exception as e:
-        return None, str(e)
+        return None, str(e), None
 
-def main():
-    ok = 0
-    fail = 0
+def get(url):
+    status, body, _ = _request("GET", url)
+    return status, body.decode() if status is not None else body
 
-    # Core + health
-    for path in ["/", "/health", "/healthz", "/ping"]:
-        status, body = get(BASE + path)
-        if status == 200:
-            print(f"  OK  GET {path}")
-            ok += 1
-            if path == "/health" and body:
-                d = json.loads(body)
-                if "uptime_seconds" in d and "models_loaded" in d:
-                    print(f"       -> uptime_seconds, models_loaded present")
+def get_json(url):
+    """Like get(), but parse the body straight from bytes (None if not JSON)."""
+    status, body, _ = _request("GET", url)
+    if status is None:
+        return status, body
+    try:
+        return status, loads(body)
+    except ValueError:
+        return status, None
+
+_JSON_START = re.compile(rb"\s*[{\[]")
+
+def get_is_json(url):
+    """GET url and report whether it returned JSON, without parsing the body.
+
+    Checks the Content-Type and that the body opens with an object or array;
+    used where the content itself is never inspected.
+    """
+    status, body, headers = _request("GET", url)
+    if status is None:
+        return status, body
+    return status, (headers.get_content_type() == "application/json"
+                    and _JSON_START.match(body) is not None)
+
+def post(url, data):
+    status, body, _ = _request("POST", url, body=json_body(data),
+                           headers=POST_JSON_HEADERS)
+    return status, body.decode() if status is not None else body
+
+def start_many(urls, fetch=get):
+    """Submit fetch(url) for every URL to the shared pool; returns the futures."""
+    return [executor().submit(fetch, url) for url in urls]
+
+def collect(futures, deadline):
+    """Results of start_many() futures, in order, waiting no later than deadline.
+
+    Anything still pending at the deadline is reported as (None, "timed out")
+    and counts as a failure, so one stalled endpoint cannot hold up the rest.
+    """
+    wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    results = []
+    for f in futures:
+        if f.done():
+            results.append(f.result())
         else:
-            print(f"  FAIL GET {path} -> {status} {body[:80]}")
-            fail += 1
+            f.cancel()
+            results.append((None, "timed out"))
+    return results
 
-    # Dashboard endpoints (all GET)
+def get_many(urls, fetch=get):
+    """GET every URL concurrently within one PHASE_BUDGET; results in order."""
+    return collect(start_many(urls, fetch), time.monotonic() + PHASE_BUDGET)
+
+def run_checks(base=BASE, quiet=False):
+    """Run one full readiness sweep against base; returns the exit code.
+
+    Safe to call repeatedly from one process (see --interval), which keeps
+    the worker pool and its keep-alive connections warm between sweeps.
+    """
+    # Resolve hosts afresh for this sweep, so a long-running --interval probe
+    # picks up a deployment whose address has changed.
+    clear_dns_cache()
+
+    # If the server is down, every readiness check would just wait out its
+    # timeout; stop here instead.
+    if not is_live(base):
+        sys.stdout.write(f"RESULT: server not live at {base} (GET /ping failed).\n")
+        return 2
+
+    # Output is collected and written once at the end; --quiet drops OK lines.
+    lines = []
+    report = lines.append
+    note = (lambda line: None) if quiet else lines.append
+    ok = 0
+    fail = 0
+
+    # Both read-only phases go out as a single round on the shared pool and
+    # share one PHASE_BUDGET; their results are reported phase by phase.
+    core_paths = ["/", "/health", "/healthz", "/ping"]
     dashboard_paths = [
         "/api/dashboard/stats",
         "/api/dashboard/predictions-over-time",
@@ -59,60 +131,64 @@ def main():
         "/api/dashboard/recent-predictions",
         "/api/dashboard/prediction-history",
     ]
-    for path in dashboard_paths:
-        status, body = get(BASE + path)
+    deadline = time.monotonic() + PHASE_BUDGET
+    core_futures = start_many([base + p for p in core_paths])
+    dashboard_futures = start_many([base + p for p in dashboard_paths], fetch=get_is_json)
+
+    # Core + health
+    for path, (status, body) in zip(core_paths, collect(core_futures, deadline)):
         if status == 200:
-            try:
-                d = json.loads(body)
-                print(f"  OK  GET {path}")
+            note(f"  OK  GET {path}")
+            ok += 1
+            if path == "/health" and body:
+                d = loads(body)
+                if "uptime_seconds" in d and "models_loaded" in d:
+                    note(f"       -> uptime_seconds, models_loaded present")
+        else:
+            report(f"  FAIL GET {path} -> {status} {body[:80]}")
+            fail += 1
+
+    # Dashboard endpoints (all GET)
+    dashboard_results = collect(dashboard_futures, deadline)
+    for path, (status, is_json) in zip(dashboard_paths, dashboard_results):
+        if status == 200:
+            if is_json:
+                note(f"  OK  GET {path}")
                 ok += 1
-            except json.JSONDecodeError:
-                print(f"  FAIL GET {path} -> invalid JSON")
+            else:
+                report(f"  FAIL GET {path} -> invalid JSON")
                 fail += 1
         else:
-            print(f"  FAIL GET {path} -> {status}")
+            report(f"  FAIL GET {path} -> {status}")
             fail += 1
 
     # Seed one prediction and verify dashboard updates
-    payload = {
-        "nanoparticle_id": "Check_CuO",
-        "core_size": 30,
-        "zeta_potential": -28,
-        "surface_area": 95,
-        "bandgap_energy": 1.2,
-        "electric_charge": -1,
-        "oxygen_atoms": 1,
-        "dosage": 40,
-        "exposure_time": 24,
-        "environmental_pH": 6.5,
-        "protein_corona": False,
-    }
-    status, body = post(BASE + "/predict", payload)
+    status, body = post(base + "/predict", _SEED_PAYLOAD)
     if status == 200:
-        print(f"  OK  POST /predict (seed)")
+        note(f"  OK  POST /predict (seed)")
         ok += 1
     else:
-        print(f"  FAIL POST /predict -> {status}")
+        report(f"  FAIL POST /predict -> {status}")
         fail += 1
 
-    # Re-check stats and toxicity after seed
-    status, body = get(BASE + "/api/dashboard/stats")
-    if status == 200:
-        d = json.loads(body)
+    # Re-check stats and toxicity after seed (both GETs in flight together)
+    (status, d), (dist_status, dist) = get_many([
+        base + "/api/dashboard/stats",
+        base + "/api/dashboard/toxicity-distribution",
+    ], fetch=get_json)
+    if status == 200 and d is not None:
         if d.get("total_predictions", 0) >= 1 and "average_response_time_ms" in d:
-            print(f"  OK  Dashboard stats updated (total_predictions, average_response_time_ms)")
+            note(f"  OK  Dashboard stats updated (total_predictions, average_response_time_ms)")
             ok += 1
         else:
-            print(f"  FAIL Dashboard stats missing fields or not updated")
+            report(f"  FAIL Dashboard stats missing fields or not updated")
             fail += 1
     else:
         fail += 1
 
-    status, body = get(BASE + "/api/dashboard/toxicity-distribution")
-    if status == 200:
-        d = json.loads(body)
-        if "toxic" in d and "non_toxic" in d:
-            print(f"  OK  Toxicity distribution has toxic/non_toxic")
+    if dist_status == 200 and dist is not None:
+        if "toxic" in dist and "non_toxic" in dist:
+            note(f"  OK  Toxicity distribution has toxic/non_toxic")
             ok += 1
         else:
             fail += 1
@@ -120,16 +196,39 @@ def main():
         fail += 1
 
     # Summary
-    print()
-    print("=" * 50)
+    report("")
+    report("=" * 50)
     if fail == 0:
-        print("RESULT: All analytics checks PASSED. Ready for cloud.")
-        print("=" * 50)
-        return 0
+        report("RESULT: All analytics checks PASSED. Ready for cloud.")
+        rc = 0
     else:
-        print(f"RESULT: {fail} check(s) FAILED. Fix before deploying.")
-        print("=" * 50)
-        return 1
+        report(f"RESULT: {fail} check(s) FAILED. Fix before deploying.")
+        rc = 1
+    report("=" * 50)
+    sys.stdout.write("\n".join(lines) + "\n")
+    return rc
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quiet", action="store_true",
+                        help="only report failures and the final result")
+    parser.add_argument("--base", default=BASE,
+                        help=f"server to check (default: {BASE})")
+    parser.add_argument("--interval", type=float, metavar="SECONDS",
+                        help="keep re-running the checks every SECONDS in this process")
+    args = parser.parse_args(argv)
+    args.base = args.base.rstrip("/")
+
+    if args.interval is None:
+        return run_checks(args.base, args.quiet)
+    rc = 0
+    try:
+        while True:
+            rc = run_checks(args.base, args.quiet)
+            sys.stdout.flush()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return rc
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -4,26 +4,158 @@ DEMO: See the real working of the API and analytics.
 Run this while the server is running (python main.py).
 Shows BEFORE → action → AFTER so you see how data flows into the dashboard.
 """
-import urllib.request
-import json
-import time
+import sys
+
+from api_client import GET_HEADERS, POST_JSON_HEADERS, dumps, executor, json_body, loads, request
+from fixtures import PAYLOAD_CUO, PAYLOAD_SIO2
 
 BASE = "http://127.0.0.1:5000"
+TIMEOUT = 5.0  # seconds, per request
+
+# Request bodies are constant, so they are serialized once at import.
+_PAYLOAD_CUO = dumps(dict(PAYLOAD_CUO))
+_PAYLOAD_SIO2 = dumps(dict(PAYLOAD_SIO2))
+
+_CONTACT_BODY = dumps({
+    "name": "Demo User",
+    "email": "demo@example.com",
+    "message": "I want to see how the dashboard gets this submission.",
+})
+
+_SHARE_BODY = dumps({
+    "name": "Demo Lab",
+    "email": "lab@example.com",
+    "dataset_description": "Demo dataset to show dashboard table.",
+})
+
+def _call(method, path, body=None, headers=GET_HEADERS):
+    status, data, _ = request(method, BASE + path, body, headers, timeout=TIMEOUT)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} -> HTTP {status}")
+    return loads(data)
 
 def get(path):
-    req = urllib.request.Request(BASE + path)
-    with urllib.request.urlopen(req, timeout=5) as r:
-        return json.loads(r.read().decode())
+    return _call("GET", path)
 
 def post(path, data):
-    req = urllib.request.Request(
-        BASE + path,
-        data=json.dumps(data).encode(),
-        method="POST",
-        headers={"Content-Type": "application/json"},
+    return _call("POST", path, body=json_body(data), headers=POST_JSON_HEADERS)
+
+def get_many(*paths):
+    """GET every path concurrently; results come back in the same order."""
+    return list(executor().map(get, paths))
+
+# ---------- Rendering: parsed responses in, report text out ----------
+
+_SNAPSHOT = """\
+  /api/dashboard/stats:
+    total_predictions     = {stats[total_predictions]}
+    average_response_time_ms = {stats[average_response_time_ms]}
+    prediction_success_count = {stats[prediction_success_count]}
+
+  /api/dashboard/request-stats (for pie chart):
+    success = {req_stats[success]}, failed = {req_stats[failed]}, total = {req_stats[total]}
+
+  /api/dashboard/toxicity-distribution (for pie/bar):
+    toxic = {dist[toxic]}, non_toxic = {dist[non_toxic]}, total = {dist[total]}
+
+  /api/dashboard/recent-predictions:
+    number of rows = {rows}
+{latest}
+  /api/dashboard/predictions-over-time:
+    series (by date) = {over_time[series]}
+
+"""
+_SNAPSHOT_LATEST = "    latest: {nanoparticle_id} -> {toxicity} (confidence {confidence})\n"
+
+_UPDATE = """\
+  /api/dashboard/stats:
+    total_predictions     = {stats[total_predictions]}  (incremented by 1)
+    average_response_time_ms = {stats[average_response_time_ms]}  (from this request)
+
+  /api/dashboard/toxicity-distribution:
+    toxic = {dist[toxic]}, non_toxic = {dist[non_toxic]}  (updated from prediction)
+
+  /api/dashboard/recent-predictions (latest row):
+{latest}
+  /api/dashboard/predictions-over-time:
+    series = {over_time[series]}  (one day with total/toxic/non_toxic)
+
+"""
+_UPDATE_LATEST = """\
+    timestamp = {timestamp}
+    nanoparticle_id = {nanoparticle_id}, toxicity = {toxicity}
+    response_time_ms = {response_time_ms}, key_factors = {key_factors}
+"""
+
+_FINAL = """\
+  1. /health (uptime, model status):
+     uptime_seconds = {health[uptime_seconds]}, models_loaded = {health[models_loaded]}
+
+  2. /api/dashboard/stats (KPI cards):
+     total_predictions = {stats[total_predictions]}
+     average_response_time_ms = {stats[average_response_time_ms]}
+
+  3. /api/dashboard/request-stats (pie: success vs failed):
+     success = {req_stats[success]}, failed = {req_stats[failed]}
+
+  4. /api/dashboard/toxicity-distribution (pie/bar: toxic vs non_toxic):
+     toxic = {dist[toxic]}, non_toxic = {dist[non_toxic]}
+
+  5. /api/dashboard/predictions-over-time (line/bar by date):
+{days}
+  6. /api/dashboard/nanoparticle-types (bar chart):
+{types}
+  7. /api/dashboard/recent-predictions (table):
+{predictions}
+  8. /api/dashboard/contact-requests (table):
+{contacts}
+  9. /api/dashboard/dataset-requests (table):
+{datasets}
+"""
+_FINAL_DAY = "     date {date}: total={total}, toxic={toxic}, non_toxic={non_toxic}\n"
+_FINAL_TYPE = "     {nanoparticle_id}: count = {count}\n"
+_FINAL_PREDICTION = "     {ts} | {nanoparticle_id} | {toxicity} | {response_time_ms} ms\n"
+_FINAL_CONTACT = "     {ts} | {name} | {email} | {text}...\n"
+
+
+def render_snapshot(stats, dist, req_stats, recent, over_time):
+    rows = recent["predictions"]
+    latest = ""
+    if rows:
+        p = rows[0]
+        latest = _SNAPSHOT_LATEST.format(nanoparticle_id=p["nanoparticle_id"], toxicity=p["toxicity"],
+                                         confidence=p.get("confidence"))
+    return _SNAPSHOT.format(stats=stats, dist=dist, req_stats=req_stats, over_time=over_time,
+                            rows=len(rows), latest=latest)
+
+
+def render_update(stats, dist, recent, over_time):
+    rows = recent["predictions"]
+    latest = ""
+    if rows:
+        p = rows[0]
+        latest = _UPDATE_LATEST.format(timestamp=p["timestamp"], nanoparticle_id=p["nanoparticle_id"],
+                                       toxicity=p["toxicity"], response_time_ms=p["response_time_ms"],
+                                       key_factors=p.get("key_factors"))
+    return _UPDATE.format(stats=stats, dist=dist, over_time=over_time, latest=latest)
+
+
+def render_final(stats, dist, req_stats, recent, over_time, nano_types, contacts, datasets, health):
+    return _FINAL.format(
+        health=health, stats=stats, req_stats=req_stats, dist=dist,
+        days="".join(_FINAL_DAY.format_map(s) for s in over_time["series"]),
+        types="".join(_FINAL_TYPE.format_map(t) for t in nano_types["series"]),
+        predictions="".join(_FINAL_PREDICTION.format(ts=p["timestamp"][:19], nanoparticle_id=p["nanoparticle_id"],
+                                                     toxicity=p["toxicity"], response_time_ms=p["response_time_ms"])
+                            for p in recent["predictions"][:3]),
+        contacts="".join(_FINAL_CONTACT.format(ts=c["timestamp"][:19], name=c["name"], email=c["email"],
+                                               text=c["message"][:40])
+                         for c in contacts["requests"][:2]),
+        datasets="".join(_FINAL_CONTACT.format(ts=d["timestamp"][:19], name=d["name"], email=d["email"],
+                                               text=d["dataset_description"][:40])
+                         for d in datasets["requests"][:2]),
     )
-    with urllib.request.urlopen(req, timeout=5) as r:
-        return json.loads(r.read().decode())
+
 
 def main():
     print("=" * 60)
@@ -33,49 +165,19 @@ def main():
 
     # ---------- BEFORE: show current dashboard state ----------
     print("\n--- BEFORE (current dashboard state) ---\n")
-    stats = get("/api/dashboard/stats")
-    dist = get("/api/dashboard/toxicity-distribution")
-    req_stats = get("/api/dashboard/request-stats")
-    recent = get("/api/dashboard/recent-predictions")
-    over_time = get("/api/dashboard/predictions-over-time")
-
-    print("  /api/dashboard/stats:")
-    print(f"    total_predictions     = {stats['total_predictions']}")
-    print(f"    average_response_time_ms = {stats['average_response_time_ms']}")
-    print(f"    prediction_success_count = {stats['prediction_success_count']}")
-    print()
-    print("  /api/dashboard/request-stats (for pie chart):")
-    print(f"    success = {req_stats['success']}, failed = {req_stats['failed']}, total = {req_stats['total']}")
-    print()
-    print("  /api/dashboard/toxicity-distribution (for pie/bar):")
-    print(f"    toxic = {dist['toxic']}, non_toxic = {dist['non_toxic']}, total = {dist['total']}")
-    print()
-    print("  /api/dashboard/recent-predictions:")
-    print(f"    number of rows = {len(recent['predictions'])}")
-    if recent["predictions"]:
-        p = recent["predictions"][0]
-        print(f"    latest: {p['nanoparticle_id']} -> {p['toxicity']} (confidence {p.get('confidence')})")
-    print()
-    print("  /api/dashboard/predictions-over-time:")
-    print(f"    series (by date) = {over_time['series']}")
-    print()
+    stats, dist, req_stats, recent, over_time = get_many(
+        "/api/dashboard/stats",
+        "/api/dashboard/toxicity-distribution",
+        "/api/dashboard/request-stats",
+        "/api/dashboard/recent-predictions",
+        "/api/dashboard/predictions-over-time",
+    )
+
+    sys.stdout.write(render_snapshot(stats, dist, req_stats, recent, over_time))
 
     # ---------- ACTION 1: Run a prediction ----------
     print("--- ACTION 1: POST /predict (CuO nanoparticle) ---\n")
-    payload = {
-        "nanoparticle_id": "CuO_30nm_demo",
-        "core_size": 30.0,
-        "zeta_potential": -28.0,
-        "surface_area": 95.0,
-        "bandgap_energy": 1.2,
-        "electric_charge": -1,
-        "oxygen_atoms": 1,
-        "dosage": 40.0,
-        "exposure_time": 24.0,
-        "environmental_pH": 6.5,
-        "protein_corona": False,
-    }
-    resp = post("/predict", payload)
+    resp = post("/predict", _PAYLOAD_CUO)
     print("  Response from /predict:")
     print(f"    success = {resp.get('success')}")
     print(f"    nanoparticle_id = {resp.get('nanoparticle_id')}")
@@ -86,112 +188,50 @@ def main():
 
     # ---------- AFTER ACTION 1: show dashboard again ----------
     print("--- AFTER ACTION 1: dashboard updated ---\n")
-    stats = get("/api/dashboard/stats")
-    dist = get("/api/dashboard/toxicity-distribution")
-    recent = get("/api/dashboard/recent-predictions")
-    over_time = get("/api/dashboard/predictions-over-time")
-    print("  /api/dashboard/stats:")
-    print(f"    total_predictions     = {stats['total_predictions']}  (incremented by 1)")
-    print(f"    average_response_time_ms = {stats['average_response_time_ms']}  (from this request)")
-    print()
-    print("  /api/dashboard/toxicity-distribution:")
-    print(f"    toxic = {dist['toxic']}, non_toxic = {dist['non_toxic']}  (updated from prediction)")
-    print()
-    print("  /api/dashboard/recent-predictions (latest row):")
-    if recent["predictions"]:
-        p = recent["predictions"][0]
-        print(f"    timestamp = {p['timestamp']}")
-        print(f"    nanoparticle_id = {p['nanoparticle_id']}, toxicity = {p['toxicity']}")
-        print(f"    response_time_ms = {p['response_time_ms']}, key_factors = {p.get('key_factors')}")
-    print()
-    print("  /api/dashboard/predictions-over-time:")
-    print(f"    series = {over_time['series']}  (one day with total/toxic/non_toxic)")
-    print()
+    stats, dist, recent, over_time = get_many(
+        "/api/dashboard/stats",
+        "/api/dashboard/toxicity-distribution",
+        "/api/dashboard/recent-predictions?limit=1",
+        "/api/dashboard/predictions-over-time",
+    )
+    sys.stdout.write(render_update(stats, dist, recent, over_time))
 
     # ---------- ACTION 2: Another prediction (SiO2 – non-toxic) ----------
     print("--- ACTION 2: POST /predict (SiO2 – usually non-toxic) ---\n")
-    payload2 = {
-        "nanoparticle_id": "SiO2_50nm_demo",
-        "core_size": 50.0,
-        "zeta_potential": -35.0,
-        "surface_area": 80.0,
-        "bandgap_energy": 9.0,
-        "electric_charge": -1,
-        "oxygen_atoms": 2,
-        "dosage": 20.0,
-        "exposure_time": 24.0,
-        "environmental_pH": 7.0,
-        "protein_corona": False,
-    }
-    resp2 = post("/predict", payload2)
+    resp2 = post("/predict", _PAYLOAD_SIO2)
     print(f"  toxicity = {resp2['stage2']['toxicity_prediction']}, confidence = {resp2['stage2']['confidence']}")
     print()
 
     # ---------- ACTION 3: Contact form ----------
     print("--- ACTION 3: POST /contact ---\n")
-    contact_resp = post("/contact", {
-        "name": "Demo User",
-        "email": "demo@example.com",
-        "message": "I want to see how the dashboard gets this submission.",
-    })
+    contact_resp = post("/contact", _CONTACT_BODY)
     print(f"  success = {contact_resp.get('success')}, message = {contact_resp.get('message')}")
     print()
 
     # ---------- ACTION 4: Dataset share ----------
     print("--- ACTION 4: POST /share-dataset ---\n")
-    share_resp = post("/share-dataset", {
-        "name": "Demo Lab",
-        "email": "lab@example.com",
-        "dataset_description": "Demo dataset to show dashboard table.",
-    })
+    share_resp = post("/share-dataset", _SHARE_BODY)
     print(f"  success = {share_resp.get('success')}")
     print()
 
     # ---------- FINAL STATE: all dashboard endpoints with real data ----------
+    # Tables only show their newest few rows, so only those are requested.
     print("--- FINAL STATE: all analytics with real data ---\n")
-    stats = get("/api/dashboard/stats")
-    dist = get("/api/dashboard/toxicity-distribution")
-    req_stats = get("/api/dashboard/request-stats")
-    recent = get("/api/dashboard/recent-predictions")
-    over_time = get("/api/dashboard/predictions-over-time")
-    nano_types = get("/api/dashboard/nanoparticle-types")
-    contacts = get("/api/dashboard/contact-requests")
-    datasets = get("/api/dashboard/dataset-requests")
-    health = get("/health")
-
-    print("  1. /health (uptime, model status):")
-    print(f"     uptime_seconds = {health['uptime_seconds']}, models_loaded = {health['models_loaded']}")
-    print()
-    print("  2. /api/dashboard/stats (KPI cards):")
-    print(f"     total_predictions = {stats['total_predictions']}")
-    print(f"     average_response_time_ms = {stats['average_response_time_ms']}")
-    print()
-    print("  3. /api/dashboard/request-stats (pie: success vs failed):")
-    print(f"     success = {req_stats['success']}, failed = {req_stats['failed']}")
-    print()
-    print("  4. /api/dashboard/toxicity-distribution (pie/bar: toxic vs non_toxic):")
-    print(f"     toxic = {dist['toxic']}, non_toxic = {dist['non_toxic']}")
-    print()
-    print("  5. /api/dashboard/predictions-over-time (line/bar by date):")
-    for s in over_time["series"]:
-        print(f"     date {s['date']}: total={s['total']}, toxic={s['toxic']}, non_toxic={s['non_toxic']}")
-    print()
-    print("  6. /api/dashboard/nanoparticle-types (bar chart):")
-    for t in nano_types["series"]:
-        print(f"     {t['nanoparticle_id']}: count = {t['count']}")
-    print()
-    print("  7. /api/dashboard/recent-predictions (table):")
-    for p in recent["predictions"][:3]:
-        print(f"     {p['timestamp'][:19]} | {p['nanoparticle_id']} | {p['toxicity']} | {p['response_time_ms']} ms")
-    print()
-    print("  8. /api/dashboard/contact-requests (table):")
-    for c in contacts["requests"][:2]:
-        print(f"     {c['timestamp'][:19]} | {c['name']} | {c['email']} | {c['message'][:40]}...")
-    print()
-    print("  9. /api/dashboard/dataset-requests (table):")
-    for d in datasets["requests"][:2]:
-        print(f"     {d['timestamp'][:19]} | {d['name']} | {d['email']} | {d['dataset_description'][:40]}...")
-    print()
+    (stats, dist, req_stats, recent, over_time,
+     nano_types, contacts, datasets, health) = get_many(
+        "/api/dashboard/stats",
+        "/api/dashboard/toxicity-distribution",
+        "/api/dashboard/request-stats",
+        "/api/dashboard/recent-predictions?limit=3",
+        "/api/dashboard/predictions-over-time",
+        "/api/dashboard/nanoparticle-types",
+        "/api/dashboard/contact-requests?limit=2",
+        "/api/dashboard/dataset-requests?limit=2",
+        "/health",
+    )
+
+    sys.stdout.write(render_final(stats, dist, req_stats, recent, over_time,
+                                  nano_types, contacts, datasets, health))
     print("=" * 60)
     print("  This is the real working: each POST updated the in-memory")
     print("  store, and every GET reads from it. Your frontend dashboard")
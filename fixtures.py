@@ -0,0 +1,35 @@
+"""
+Sample /predict payloads shared by check_analytics_ready.py and demo_real_working.py.
+Read-only mappings: copy with {**PAYLOAD_CUO, ...} to change a field.
+"""
+from types import MappingProxyType
+
+# CuO, 30 nm – predicted TOXIC
+PAYLOAD_CUO = MappingProxyType({
+    "nanoparticle_id": "CuO_30nm_demo",
+    "core_size": 30.0,
+    "zeta_potential": -28.0,
+    "surface_area": 95.0,
+    "bandgap_energy": 1.2,
+    "electric_charge": -1,
+    "oxygen_atoms": 1,
+    "dosage": 40.0,
+    "exposure_time": 24.0,
+    "environmental_pH": 6.5,
+    "protein_corona": False,
+})
+
+# SiO2, 50 nm – predicted NON-TOXIC
+PAYLOAD_SIO2 = MappingProxyType({
+    "nanoparticle_id": "SiO2_50nm_demo",
+    "core_size": 50.0,
+    "zeta_potential": -35.0,
+    "surface_area": 80.0,
+    "bandgap_energy": 9.0,
+    "electric_charge": -1,
+    "oxygen_atoms": 2,
+    "dosage": 20.0,
+    "exposure_time": 24.0,
+    "environmental_pH": 7.0,
+    "protein_corona": False,
+})
@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for production (used by Procfile and railway.json).
+Tune with environment variables instead of editing the start command.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Import main.py (and load the .pkl models) once in the master process, then
+# fork the workers: the models are shared copy-on-write instead of being
+# unpickled again in every worker.
+preload_app = True
+
+# /predict success/fail counts and response times are shared between workers,
+# but the dashboard's prediction/contact/dataset logs are kept in memory per
+# process, so more than one worker splits them across workers. Hence one
+# worker by default; set NANOTOX_WORKERS only once that is OK. (Not
+# WEB_CONCURRENCY: some platforms, e.g. Heroku's Python buildpack, set that
+# on their own.)
+workers = int(os.environ.get('NANOTOX_WORKERS', '1'))
+
+# Threaded workers: /contact and /share-dataset block on SMTP for hundreds of
+# milliseconds, which with sync workers stalls every other request. Plain
+# threads (rather than gevent) need no monkey-patching around the native
+# numpy/scikit-learn code, and the GIL is released while waiting on sockets.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# One worker per core already saturates the CPU; keep numpy/scikit-learn from
+# starting a thread pool per worker on top of that. Must be set before the
+# app (and numpy) is imported, which preload does right after this file.
+for _var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+    os.environ.setdefault(_var, '1')
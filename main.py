@@ -4,94 +4,151 @@ Enhanced ML Web Server for Nanoparticle Toxicity Prediction
 Uses the REFINED trained ML models with all integrated datasets
 """
 
-from flask import Flask, render_template_string, request, jsonify, g
+from flask import Flask, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import pandas as pd
 import numpy as np
-import joblib
-import webbrowser
 import time
 import threading
+import multiprocessing
 import os
-import smtplib
 import re
-from collections import deque, defaultdict
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import json
+import sqlite3
+import hashlib
+import functools
+from collections import deque, namedtuple, Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
+from dotenv import load_dotenv
 
-# Load environment variables from .env file if it exists
 try:
-    with open('.env', 'r') as f:
-        for line in f:
-            if line.strip() and not line.startswith('#'):
-                key, value = line.strip().split('=', 1)
-                os.environ[key] = value
-    print("SUCCESS: Loaded email configuration from .env file")
-except FileNotFoundError:
-    print("INFO: No .env file found. Using default email configuration.")
-    print("INFO: Email functionality will work with default settings.")
+    import orjson
+except ImportError:  # stdlib json via Flask's default provider
+    orjson = None
+
+# Load environment variables from .env file if it exists (its values take
+# precedence over variables already set in the environment)
+try:
+    if os.path.exists('.env'):
+        load_dotenv('.env', override=True)
+        print("SUCCESS: Loaded email configuration from .env file")
+    else:
+        print("INFO: No .env file found. Using default email configuration.")
+        print("INFO: Email functionality will work with default settings.")
 except Exception as e:
     print(f"WARNING: Error loading .env file: {e}")
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes responses with orjson"""
+    
+    def _encode(self, obj, indent):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+    
+    def dumps(self, obj, **kwargs):
+        # jsonify only passes indent/separators; anything else gets stdlib json
+        if kwargs.keys() - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj, kwargs.get('indent')).decode()
+    
+    def response(self, *args, **kwargs):
+        # As DefaultJSONProvider.response, but orjson's bytes go straight into
+        # the response body instead of bytes -> str -> bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS for frontend integration
 
-# Load the enhanced trained ML models
-try:
-    print("INFO: Loading enhanced trained ML models...")
-    
-    # Stage 1: Aggregation Model
-    aggregation_model = joblib.load('enhanced_nanoparticle_model_aggregation.pkl')
-    print("SUCCESS: Enhanced aggregation model loaded")
-    
-    # Stage 2: Toxicity Model  
-    toxicity_model = joblib.load('enhanced_nanoparticle_model_toxicity.pkl')
-    print("SUCCESS: Enhanced toxicity model loaded")
-    
-    # Stage 3: Cytotoxicity Models
-    cytotoxicity_models = {}
-    mechanism_files = [
-        'enhanced_nanoparticle_model_cytotoxicity_ros_production.pkl',
-        'enhanced_nanoparticle_model_cytotoxicity_membrane_damage.pkl',
-        'enhanced_nanoparticle_model_cytotoxicity_apoptosis.pkl',
-        'enhanced_nanoparticle_model_cytotoxicity_necrosis.pkl'
-    ]
-    
-    for mechanism_file in mechanism_files:
-        if os.path.exists(mechanism_file):
-            mechanism_name = mechanism_file.split('_')[-1].replace('.pkl', '')
-            cytotoxicity_models[mechanism_name] = joblib.load(mechanism_file)
-            print(f"SUCCESS: Enhanced {mechanism_name} model loaded")
-    
-    # Load scaler and encoders
-    scaler = joblib.load('enhanced_nanoparticle_scaler.pkl')
-    encoders = joblib.load('enhanced_nanoparticle_encoders.pkl')
-    print("SUCCESS: Enhanced scaler and encoders loaded")
-    
-    print("SUCCESS: All enhanced ML models loaded successfully!")
+def _load_models():
+    """Load the enhanced trained ML models (None/empty placeholders if they fail to load)"""
+    import joblib  # nothing else in this module needs it
     
-except Exception as e:
-    print(f"ERROR: Error loading enhanced models: {e}")
-    print("WARNING: Using fallback prediction system")
-    aggregation_model = None
-    toxicity_model = None
-    cytotoxicity_models = {}
-    scaler = None
-    encoders = {}
+    try:
+        print("INFO: Loading enhanced trained ML models...")
+        
+        # Stage 1: Aggregation Model
+        aggregation_model = joblib.load('enhanced_nanoparticle_model_aggregation.pkl')
+        print("SUCCESS: Enhanced aggregation model loaded")
+        
+        # Stage 2: Toxicity Model  
+        toxicity_model = joblib.load('enhanced_nanoparticle_model_toxicity.pkl')
+        print("SUCCESS: Enhanced toxicity model loaded")
+        
+        # Stage 3: Cytotoxicity Models
+        cytotoxicity_models = {}
+        mechanism_files = [
+            'enhanced_nanoparticle_model_cytotoxicity_ros_production.pkl',
+            'enhanced_nanoparticle_model_cytotoxicity_membrane_damage.pkl',
+            'enhanced_nanoparticle_model_cytotoxicity_apoptosis.pkl',
+            'enhanced_nanoparticle_model_cytotoxicity_necrosis.pkl'
+        ]
+        
+        for mechanism_file in mechanism_files:
+            if os.path.exists(mechanism_file):
+                mechanism_name = mechanism_file.split('_')[-1].replace('.pkl', '')
+                cytotoxicity_models[mechanism_name] = joblib.load(mechanism_file)
+                print(f"SUCCESS: Enhanced {mechanism_name} model loaded")
+        
+        # Load scaler and encoders
+        scaler = joblib.load('enhanced_nanoparticle_scaler.pkl')
+        encoders = joblib.load('enhanced_nanoparticle_encoders.pkl')
+        print("SUCCESS: Enhanced scaler and encoders loaded")
+        
+        print("SUCCESS: All enhanced ML models loaded successfully!")
+        return aggregation_model, toxicity_model, cytotoxicity_models, scaler, encoders
+        
+    except Exception as e:
+        print(f"ERROR: Error loading enhanced models: {e}")
+        print("WARNING: Using fallback prediction system")
+        return None, None, {}, None, {}
+
+# Loaded at import so gunicorn's preload shares them with every worker
+aggregation_model, toxicity_model, cytotoxicity_models, scaler, encoders = _load_models()
 
 # ----- Dashboard in-memory storage (resets on deploy; replace with DB for persistence) -----
 APP_START_TIME = datetime.utcnow()
-DASHBOARD_PREDICTIONS = []       # max 2000
-DASHBOARD_CONTACTS = []
-DASHBOARD_DATASETS = []
-PREDICTION_REQUEST_SUCCESS = 0
-PREDICTION_REQUEST_FAIL = 0
-PREDICTION_RESPONSE_TIMES_MS = deque(maxlen=500)
+DASHBOARD_PREDICTIONS = deque(maxlen=2000)   # PredictionRecord entries
+DASHBOARD_CONTACTS = deque(maxlen=500)
+DASHBOARD_DATASETS = deque(maxlen=500)
 
-def _limit_list(lst, maxlen):
-    if len(lst) > maxlen:
-        del lst[: len(lst) - maxlen]
+# /predict request stats live in shared memory created at import. gunicorn forks
+# its workers after importing this module (preload_app), so every worker
+# updates the same counters and latency ring and the dashboard reports totals
+# for the whole server. Writers and readers take one cross-process lock.
+_STATS_LOCK = multiprocessing.Lock()
+PREDICTION_REQUEST_SUCCESS = multiprocessing.RawValue('q', 0)
+PREDICTION_REQUEST_FAIL = multiprocessing.RawValue('q', 0)
+RESPONSE_TIMES_SIZE = 500
+PREDICTION_RESPONSE_TIMES_MS = multiprocessing.RawArray('d', RESPONSE_TIMES_SIZE)  # ring buffer
+PREDICTION_RESPONSE_TIMES_COUNT = multiprocessing.RawValue('q', 0)  # samples ever written
+# NumPy view of the same shared buffer, for averaging without a Python loop
+_RESPONSE_TIMES_ARR = np.frombuffer(PREDICTION_RESPONSE_TIMES_MS, dtype=np.float64)
+
+# (second, "YYYY-MM-DDTHH:MM:SS") of the last timestamp; swapped as one tuple so
+# concurrent threads never pair a new second with an old prefix
+_TS_CACHE = (0, '')
+
+def _iso_now():
+    """UTC ISO-8601 timestamp with microseconds, formatting the date part once per second"""
+    global _TS_CACHE
+    t = time.time()
+    sec = int(t)
+    cached_sec, prefix = _TS_CACHE
+    if sec != cached_sec:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec))
+        _TS_CACHE = (sec, prefix)
+    return f"{prefix}.{int((t - sec) * 1e6):06d}Z"
 
 @app.before_request
 def _record_request_start():
@@ -99,17 +156,27 @@ def _record_request_start():
 
 @app.after_request
 def _record_request_stats(response):
-    if request.path == "/predict":
-        elapsed_ms = (time.time() - getattr(g, "start_time", time.time())) * 1000
-        if response.status_code < 400:
-            global PREDICTION_REQUEST_SUCCESS
-            PREDICTION_REQUEST_SUCCESS += 1
-            PREDICTION_RESPONSE_TIMES_MS.append(elapsed_ms)
-        else:
-            global PREDICTION_REQUEST_FAIL
-            PREDICTION_REQUEST_FAIL += 1
+    if request.path in ("/predict", "/predict_batch"):
+        # A batch counts as one success per record (as it is logged to the
+        # dashboard) and one response-time sample of its per-record time
+        count = getattr(g, "prediction_count", 1)
+        elapsed_ms = (time.time() - getattr(g, "start_time", time.time())) * 1000 / count
+        with _STATS_LOCK:
+            if response.status_code < 400:
+                PREDICTION_REQUEST_SUCCESS.value += count
+                n = PREDICTION_RESPONSE_TIMES_COUNT.value
+                PREDICTION_RESPONSE_TIMES_MS[n % RESPONSE_TIMES_SIZE] = elapsed_ms
+                PREDICTION_RESPONSE_TIMES_COUNT.value = n + 1
+            else:
+                PREDICTION_REQUEST_FAIL.value += 1
     return response
 
+def _prediction_request_stats():
+    """Consistent (success, fail, last response times in ms) snapshot across workers"""
+    with _STATS_LOCK:
+        n = min(PREDICTION_RESPONSE_TIMES_COUNT.value, RESPONSE_TIMES_SIZE)
+        return PREDICTION_REQUEST_SUCCESS.value, PREDICTION_REQUEST_FAIL.value, _RESPONSE_TIMES_ARR[:n].copy()
+
 # Simple API documentation page
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -193,6 +260,12 @@ HTML_TEMPLATE = """
 }</pre>
         </div>
 
+        <div class="api-endpoint">
+            <h3><span class="method">POST</span> /predict_batch</h3>
+            <div class="endpoint-url">POST /predict_batch</div>
+            <p>Run the same pipeline over a JSON list of /predict request bodies in one call.</p>
+        </div>
+
         <div class="api-endpoint">
             <h3><span class="method">POST</span> /contact</h3>
             <div class="endpoint-url">POST /contact</div>
@@ -231,94 +304,156 @@ HTML_TEMPLATE = """
 </html>
 """
 
-def predict_aggregation_stage(data, mode="BIOLOGICAL_CONTEXT"):
+# Material-specific toxicity prior, matched by substring of nanoparticle_id.
+# Checked in this order; the first material found wins.
+_MATERIAL_TOX = {'CuO': 0.9, 'NiO': 0.8, 'ZnO': 0.8, 'SiO2': 0.1, 'CeO2': 0.2}
+
+def _material_tox(nanoparticle_id):
+    """Toxicity prior for the first known material in nanoparticle_id (0.0 if none)"""
+    for material, toxicity in _MATERIAL_TOX.items():
+        if material in nanoparticle_id:
+            return toxicity
+    return 0.0
+
+# Scoring rules shared by the scalar stage functions and the NumPy batch path
+# (predict_batch_stages). Change them here so both paths keep agreeing.
+# Stage 1: hydrodynamic diameter = core_size * _HD_BASE_FACTOR * aggregation
+_HD_BASE_FACTOR = 1.2
+_AGG_ZETA_BANDS = (25, 40)              # |zeta| below these picks factor [0] / [1], else [2]
+_AGG_FACTORS_BIO = (1.5, 1.2, 1.0)
+_AGG_FACTORS_NON_BIO = (1.3, 1.1, 1.0)
+_AGG_PH_RANGE = (6.0, 8.0)              # biological context only: pH outside the range,
+_AGG_PH_FACTOR = 1.3                    # temperature above the limit and a protein
+_AGG_TEMP_LIMIT = 37                    # corona each multiply the aggregation factor
+_AGG_TEMP_FACTOR = 1.1
+_AGG_CORONA_FACTOR = 1.2
+_STABILITY_ZETA = (15, 30)              # |zeta| above these: MODERATE / HIGH stability
+_STABILITY_LEVELS = (
+    "LOW STABILITY - Prone to aggregation",
+    "MODERATE STABILITY - Some aggregation possible",
+    "HIGH STABILITY - Well dispersed",
+)
+# Stage 2: composite toxicity score, then confidence and risk
+_SCORE_WEIGHTS = (0.4, 0.2, 0.15, 0.15, 0.1)   # material, size, surface, zeta, dose
+_SMALL_CORE_SIZE = 50                   # size factor 1.0 below it, 0.5 otherwise
+_SIZE_FACTORS = (1.0, 0.5)
+_SURFACE_SCALE = 100                    # surface, zeta and dose factors are these
+_ZETA_SCALE = 50                        # fractions, capped at 1 (zeta: at 0 below)
+_DOSE_SCALE = 100
+_TOXIC_THRESHOLD = 0.6                  # composite score above it is TOXIC
+_CONFIDENCE_OFFSET = 0.1                # confidence = min(_MAX_CONFIDENCE, score + offset)
+_MAX_CONFIDENCE = 0.95
+_RISK_THRESHOLDS = (0.6, 0.8)           # confidence above these: MODERATE / HIGH risk
+_RISK_LEVELS = (
+    "LOW RISK - Minimal concern",
+    "MODERATE RISK - Monitor closely",
+    "HIGH RISK - Immediate concern",
+)
+
+def _composite_score(material_toxicity, core_size, surface_area, zeta_potential, dosage):
+    """Weighted toxicity score from material prior, size, surface, zeta and dose"""
+    # Clamps are written as conditional expressions rather than min()/max()
+    # calls; the results are identical, without the builtin call overhead
+    size_factor = _SIZE_FACTORS[0] if core_size < _SMALL_CORE_SIZE else _SIZE_FACTORS[1]
+    surface_factor = surface_area / _SURFACE_SCALE
+    if surface_factor > 1.0:
+        surface_factor = 1.0
+    zeta_factor = (_ZETA_SCALE - abs(zeta_potential)) / _ZETA_SCALE
+    if not zeta_factor > 0:
+        zeta_factor = 0
+    dose_factor = dosage / _DOSE_SCALE
+    if dose_factor > 1.0:
+        dose_factor = 1.0
+    
+    w_material, w_size, w_surface, w_zeta, w_dose = _SCORE_WEIGHTS
+    return (
+        material_toxicity * w_material +
+        size_factor * w_size +
+        surface_factor * w_surface +
+        zeta_factor * w_zeta +
+        dose_factor * w_dose
+    )
+
+def _stability(zeta_abs):
+    """Stage 1 stability assessment for an absolute zeta potential"""
+    if zeta_abs > _STABILITY_ZETA[1]:
+        return _STABILITY_LEVELS[2]
+    if zeta_abs > _STABILITY_ZETA[0]:
+        return _STABILITY_LEVELS[1]
+    return _STABILITY_LEVELS[0]
+
+# Numeric request fields, read from the body once per prediction and unpacked
+# by each stage. Values keep their JSON types so results match reading data[...]
+_FEATURE_ORDER = ('core_size', 'surface_area', 'zeta_potential', 'dosage',
+                  'hydrodynamic_diameter', 'environmental_pH', 'temperature', 'protein_corona')
+
+def _extract_features(data):
+    """Tuple of _FEATURE_ORDER values; required fields raise KeyError, optional ones default to None"""
+    return (
+        data['core_size'], data['surface_area'], data['zeta_potential'], data['dosage'],
+        data.get('hydrodynamic_diameter'), data.get('environmental_pH'),
+        data.get('temperature'), data.get('protein_corona'),
+    )
+
+def predict_aggregation_stage(data, mode="BIOLOGICAL_CONTEXT", feats=None):
     """Stage 1: Predict aggregation and hydrodynamic diameter using enhanced model"""
     
+    if feats is None:
+        feats = _extract_features(data)
+    core_size, _, zeta_potential, _, hydrodynamic_diameter, ph, temp, protein_corona = feats
+    
     try:
         # Check if hydrodynamic_diameter is already provided
-        if 'hydrodynamic_diameter' in data and data['hydrodynamic_diameter'] is not None:
+        if hydrodynamic_diameter is not None:
             # Use provided hydrodynamic diameter, skip ML model calculation
-            provided_hd = float(data['hydrodynamic_diameter'])
-            original_size = data['core_size'] * 1.2
+            provided_hd = float(hydrodynamic_diameter)
+            original_size = core_size * _HD_BASE_FACTOR
             agg_factor = provided_hd / original_size
             
-            # Enhanced stability assessment based on provided diameter
-            if abs(data['zeta_potential']) > 30:
-                stability = "HIGH STABILITY - Well dispersed"
-            elif abs(data['zeta_potential']) > 15:
-                stability = "MODERATE STABILITY - Some aggregation possible"
-            else:
-                stability = "LOW STABILITY - Prone to aggregation"
-            
             return {
                 'predicted_hydrodynamic_diameter': f"{provided_hd:.1f}",
                 'aggregation_factor': f"{agg_factor:.2f}x",
-                'stability_assessment': stability,
+                'stability_assessment': _stability(abs(zeta_potential)),
                 'calculation_method': "PROVIDED",
                 'mode': mode
             }
         
         # If hydrodynamic_diameter not provided, calculate based on mode
-        if mode == "BIOLOGICAL_CONTEXT":
-            # Enhanced biological context calculation with pH, temperature, protein corona
-            base_hd = data['core_size'] * 1.2
-            zeta_abs = abs(data['zeta_potential'])
-            
-            # Base aggregation factor
-            if zeta_abs < 25:
-                agg_factor = 1.5
-            elif zeta_abs < 40:
-                agg_factor = 1.2
-            else:
-                agg_factor = 1.0
-            
-            # Biological context adjustments
-            if 'environmental_pH' in data and data['environmental_pH'] is not None:
-                ph = data['environmental_pH']
-                if ph < 6.0 or ph > 8.0:
-                    agg_factor *= 1.3  # Unfavorable pH increases aggregation
-            
-            if 'temperature' in data and data['temperature'] is not None:
-                temp = data['temperature']
-                if temp > 37:  # Above body temperature
-                    agg_factor *= 1.1
-            
-            if 'protein_corona' in data and data['protein_corona']:
-                agg_factor *= 1.2  # Protein corona increases size
-            
-            predicted_hd = base_hd * agg_factor
-            
+        base_hd = core_size * _HD_BASE_FACTOR
+        zeta_abs = abs(zeta_potential)
+        bio = mode == "BIOLOGICAL_CONTEXT"
+        
+        # Base aggregation factor from zeta potential
+        factors = _AGG_FACTORS_BIO if bio else _AGG_FACTORS_NON_BIO
+        if zeta_abs < _AGG_ZETA_BANDS[0]:
+            agg_factor = factors[0]
+        elif zeta_abs < _AGG_ZETA_BANDS[1]:
+            agg_factor = factors[1]
         else:
-            # Non-biological context - simpler calculation
-            base_hd = data['core_size'] * 1.2
-            zeta_abs = abs(data['zeta_potential'])
+            agg_factor = factors[2]
+        
+        if bio:
+            # Biological context adjustments
+            if ph is not None:
+                if ph < _AGG_PH_RANGE[0] or ph > _AGG_PH_RANGE[1]:
+                    agg_factor *= _AGG_PH_FACTOR  # Unfavorable pH increases aggregation
             
-            # Simple aggregation factor based only on zeta potential
-            if zeta_abs < 25:
-                agg_factor = 1.3
-            elif zeta_abs < 40:
-                agg_factor = 1.1
-            else:
-                agg_factor = 1.0
+            if temp is not None:
+                if temp > _AGG_TEMP_LIMIT:  # Above body temperature
+                    agg_factor *= _AGG_TEMP_FACTOR
             
-            predicted_hd = base_hd * agg_factor
+            if protein_corona:
+                agg_factor *= _AGG_CORONA_FACTOR  # Protein corona increases size
+        
+        predicted_hd = base_hd * agg_factor
         
         # Calculate aggregation factor
-        original_size = data['core_size'] * 1.2
-        agg_factor = predicted_hd / original_size
-        
-        # Enhanced stability assessment
-        if abs(data['zeta_potential']) > 30:
-            stability = "HIGH STABILITY - Well dispersed"
-        elif abs(data['zeta_potential']) > 15:
-            stability = "MODERATE STABILITY - Some aggregation possible"
-        else:
-            stability = "LOW STABILITY - Prone to aggregation"
+        agg_factor = predicted_hd / base_hd
         
         return {
             'predicted_hydrodynamic_diameter': f"{predicted_hd:.1f}",
             'aggregation_factor': f"{agg_factor:.2f}x",
-            'stability_assessment': stability,
+            'stability_assessment': _stability(zeta_abs),
             'calculation_method': "CALCULATED",
             'mode': mode
         }
@@ -326,109 +461,47 @@ def predict_aggregation_stage(data, mode="BIOLOGICAL_CONTEXT"):
     except Exception as e:
         print(f"Aggregation prediction error: {e}")
         return {
-            'predicted_hydrodynamic_diameter': f"{data['core_size'] * 1.5:.1f}",
+            'predicted_hydrodynamic_diameter': f"{core_size * 1.5:.1f}",
             'aggregation_factor': "1.5x",
             'stability_assessment': "ESTIMATED",
             'calculation_method': "FALLBACK"
         }
 
-def predict_toxicity_stage(data, stage1_result, mode="BIOLOGICAL_CONTEXT"):
+def predict_toxicity_stage(data, stage1_result, mode="BIOLOGICAL_CONTEXT", feats=None):
     """Stage 2: Predict overall toxicity using enhanced model"""
     
-    try:
-        # Always use enhanced fallback prediction with material-specific knowledge
-        # This ensures we get definitive predictions
-        material_toxicity = 0.0
-        if 'CuO' in data['nanoparticle_id']:
-            material_toxicity = 0.9
-        elif 'NiO' in data['nanoparticle_id']:
-            material_toxicity = 0.8
-        elif 'ZnO' in data['nanoparticle_id']:
-            material_toxicity = 0.8
-        elif 'SiO2' in data['nanoparticle_id']:
-            material_toxicity = 0.1
-        elif 'CeO2' in data['nanoparticle_id']:
-            material_toxicity = 0.2
-        
-        # Enhanced composite score calculation
-        size_factor = 1.0 if data['core_size'] < 50 else 0.5
-        surface_factor = min(data['surface_area'] / 100, 1.0)
-        zeta_factor = max(0, (50 - abs(data['zeta_potential'])) / 50)
-        dose_factor = min(data['dosage'] / 100, 1.0)
-        
-        composite_score = (
-            material_toxicity * 0.4 +
-            size_factor * 0.2 +
-            surface_factor * 0.15 +
-            zeta_factor * 0.15 +
-            dose_factor * 0.1
-        )
-        
-        prediction = "TOXIC" if composite_score > 0.6 else "NON-TOXIC"
-        confidence = min(0.95, composite_score + 0.1)
-        toxicity_prob = [1 - composite_score, composite_score]
-        
-        # Enhanced risk level assessment
-        if confidence > 0.8:
-            risk_level = "HIGH RISK - Immediate concern"
-        elif confidence > 0.6:
-            risk_level = "MODERATE RISK - Monitor closely"
-        else:
-            risk_level = "LOW RISK - Minimal concern"
-        
-        return {
-            'toxicity_prediction': prediction,
-            'confidence': confidence,
-            'risk_level': risk_level,
-            'composite_score': confidence
-        }
-        
-    except Exception as e:
-        print(f"Toxicity prediction error: {e}")
-        # Enhanced fallback prediction with material-specific knowledge
-        material_toxicity = 0.0
-        if 'CuO' in data['nanoparticle_id']:
-            material_toxicity = 0.9
-        elif 'NiO' in data['nanoparticle_id']:
-            material_toxicity = 0.8
-        elif 'ZnO' in data['nanoparticle_id']:
-            material_toxicity = 0.8
-        elif 'SiO2' in data['nanoparticle_id']:
-            material_toxicity = 0.1
-        elif 'CeO2' in data['nanoparticle_id']:
-            material_toxicity = 0.2
-        
-        # Enhanced composite score calculation
-        size_factor = 1.0 if data['core_size'] < 50 else 0.5
-        surface_factor = min(data['surface_area'] / 100, 1.0)
-        zeta_factor = max(0, (50 - abs(data['zeta_potential'])) / 50)
-        dose_factor = min(data['dosage'] / 100, 1.0)
-        
-        composite_score = (
-            material_toxicity * 0.4 +
-            size_factor * 0.2 +
-            surface_factor * 0.15 +
-            zeta_factor * 0.15 +
-            dose_factor * 0.1
-        )
-        
-        prediction = "TOXIC" if composite_score > 0.6 else "NON-TOXIC"
-        confidence = min(0.95, composite_score + 0.1)
-        
-        # Enhanced risk level assessment
-        if confidence > 0.8:
-            risk_level = "HIGH RISK - Immediate concern"
-        elif confidence > 0.6:
-            risk_level = "MODERATE RISK - Monitor closely"
-        else:
-            risk_level = "LOW RISK - Minimal concern"
-        
-        return {
-            'toxicity_prediction': prediction,
-            'confidence': confidence,
-            'risk_level': risk_level,
-            'composite_score': confidence
-        }
+    if feats is None:
+        feats = _extract_features(data)
+    core_size, surface_area, zeta_potential, dosage = feats[:4]
+    
+    # Always use enhanced fallback prediction with material-specific knowledge
+    # This ensures we get definitive predictions
+    material_toxicity = _material_tox(data['nanoparticle_id'])
+    
+    # Enhanced composite score calculation
+    composite_score = _composite_score(
+        material_toxicity, core_size, surface_area, zeta_potential, dosage
+    )
+    
+    prediction = "TOXIC" if composite_score > _TOXIC_THRESHOLD else "NON-TOXIC"
+    confidence = min(_MAX_CONFIDENCE, composite_score + _CONFIDENCE_OFFSET)
+    
+    # Enhanced risk level assessment
+    if confidence > _RISK_THRESHOLDS[1]:
+        risk_level = _RISK_LEVELS[2]
+    elif confidence > _RISK_THRESHOLDS[0]:
+        risk_level = _RISK_LEVELS[1]
+    else:
+        risk_level = _RISK_LEVELS[0]
+    
+    return {
+        'toxicity_prediction': prediction,
+        'confidence': confidence,
+        'risk_level': risk_level,
+        'composite_score': confidence,
+        # Internal, reused for key_factors; popped before the response is built
+        '_material_toxicity': material_toxicity
+    }
 
 def predict_cytotoxicity_stage(data, stage1_result, stage2_result, mode="BIOLOGICAL_CONTEXT"):
     """Stage 3: Predict overall cytotoxicity - Simple YES/NO answer"""
@@ -476,21 +549,210 @@ def detect_prediction_mode(data):
     else:
         return "NON_BIOLOGICAL_CONTEXT"
 
+# ----- Batch pipeline (/predict_batch) -----
+MAX_BATCH_SIZE = 1000
+
+def _is_real(value):
+    """True for JSON numbers that float64 represents without changing scalar results"""
+    return type(value) in (int, float, bool) and -2**53 <= value <= 2**53
+
+def _vectorizable(data, mode):
+    """Whether a record can take the NumPy path and still match the scalar stages"""
+    if not isinstance(data.get('nanoparticle_id'), str):
+        return False
+    if not all(_is_real(data.get(field)) for field in ('core_size', 'surface_area', 'zeta_potential', 'dosage')):
+        return False
+    if data['core_size'] == 0:
+        return False
+    optional = ['hydrodynamic_diameter']
+    if mode == "BIOLOGICAL_CONTEXT":
+        optional += ['environmental_pH', 'temperature']
+    return all(data.get(field) is None or _is_real(data[field]) for field in optional)
+
+def predict_batch_stages(records):
+    """Run stages 1-3 over many records, doing the numeric work with NumPy arrays
+
+    Returns a (mode, stage1, stage2, stage3, key_factors) tuple per record, like
+    _run_pipeline. Records that the array path can't reproduce exactly (missing
+    or non-numeric fields, zero core size) go through the scalar stage functions
+    instead.
+    """
+    modes = [detect_prediction_mode(data) for data in records]
+    results = [None] * len(records)
+    idx = [i for i, data in enumerate(records) if _vectorizable(data, modes[i])]
+    
+    if idx:
+        rows = [records[i] for i in idx]
+        bio = np.array([modes[i] == "BIOLOGICAL_CONTEXT" for i in idx])
+        core = np.array([data['core_size'] for data in rows], dtype=float)
+        surface = np.array([data['surface_area'] for data in rows], dtype=float)
+        zeta_abs = np.abs(np.array([data['zeta_potential'] for data in rows], dtype=float))
+        dose = np.array([data['dosage'] for data in rows], dtype=float)
+        provided = np.array([data.get('hydrodynamic_diameter') is not None for data in rows])
+        provided_hd = np.array([np.nan if data.get('hydrodynamic_diameter') is None else data['hydrodynamic_diameter'] for data in rows], dtype=float)
+        ph = np.array([np.nan if data.get('environmental_pH') is None else data['environmental_pH'] for data in rows], dtype=float)
+        temp = np.array([np.nan if data.get('temperature') is None else data['temperature'] for data in rows], dtype=float)
+        corona = np.array([bool(data.get('protein_corona')) for data in rows])
+        
+        # Stage 1: same rules as predict_aggregation_stage, applied in the same order
+        base_hd = core * _HD_BASE_FACTOR
+        low, high = _AGG_ZETA_BANDS
+        band = np.where(zeta_abs < low, 0, np.where(zeta_abs < high, 1, 2))
+        agg = np.where(bio, np.take(_AGG_FACTORS_BIO, band), np.take(_AGG_FACTORS_NON_BIO, band))
+        agg = np.where(bio & ((ph < _AGG_PH_RANGE[0]) | (ph > _AGG_PH_RANGE[1])), agg * _AGG_PH_FACTOR, agg)
+        agg = np.where(bio & (temp > _AGG_TEMP_LIMIT), agg * _AGG_TEMP_FACTOR, agg)
+        agg = np.where(bio & corona, agg * _AGG_CORONA_FACTOR, agg)
+        predicted_hd = np.where(provided, provided_hd, base_hd * agg)
+        agg_factor = predicted_hd / base_hd
+        stability = (zeta_abs > _STABILITY_ZETA[1]).astype(int) + (zeta_abs > _STABILITY_ZETA[0])
+        
+        # Stage 2: same arithmetic as _composite_score and predict_toxicity_stage
+        material = np.array([_material_tox(data['nanoparticle_id']) for data in rows])
+        size_factor = np.where(core < _SMALL_CORE_SIZE, _SIZE_FACTORS[0], _SIZE_FACTORS[1])
+        surface_factor = surface / _SURFACE_SCALE
+        surface_factor = np.where(surface_factor > 1.0, 1.0, surface_factor)
+        zeta_factor = (_ZETA_SCALE - zeta_abs) / _ZETA_SCALE
+        zeta_factor = np.where(zeta_factor > 0, zeta_factor, 0.0)
+        dose_factor = dose / _DOSE_SCALE
+        dose_factor = np.where(dose_factor > 1.0, 1.0, dose_factor)
+        w_material, w_size, w_surface, w_zeta, w_dose = _SCORE_WEIGHTS
+        composite = (
+            material * w_material +
+            size_factor * w_size +
+            surface_factor * w_surface +
+            zeta_factor * w_zeta +
+            dose_factor * w_dose
+        )
+        toxic = composite > _TOXIC_THRESHOLD
+        confidence = composite + _CONFIDENCE_OFFSET
+        confidence = np.where(confidence < _MAX_CONFIDENCE, confidence, _MAX_CONFIDENCE)
+        risk = (confidence > _RISK_THRESHOLDS[1]).astype(int) + (confidence > _RISK_THRESHOLDS[0])
+        
+        columns = zip(idx, predicted_hd.tolist(), agg_factor.tolist(), stability.tolist(),
+                      provided.tolist(), toxic.tolist(), confidence.tolist(), risk.tolist(),
+                      material.tolist())
+        for i, hd, factor, stable, was_provided, is_toxic, conf, risk_idx, mat in columns:
+            stage1_result = {
+                'predicted_hydrodynamic_diameter': f"{hd:.1f}",
+                'aggregation_factor': f"{factor:.2f}x",
+                'stability_assessment': _STABILITY_LEVELS[stable],
+                'calculation_method': "PROVIDED" if was_provided else "CALCULATED",
+                'mode': modes[i]
+            }
+            stage2_result = {
+                'toxicity_prediction': "TOXIC" if is_toxic else "NON-TOXIC",
+                'confidence': conf,
+                'risk_level': _RISK_LEVELS[risk_idx],
+                'composite_score': conf
+            }
+            stage3_result = predict_cytotoxicity_stage(records[i], stage1_result, stage2_result, modes[i])
+            key_factors = _key_factors(records[i], modes[i], material_toxicity=mat)
+            results[i] = (modes[i], stage1_result, stage2_result, stage3_result, key_factors)
+    
+    for i, data in enumerate(records):
+        if results[i] is None:
+            mode = modes[i]
+            stage1_result = predict_aggregation_stage(data, mode)
+            stage2_result = predict_toxicity_stage(data, stage1_result, mode)
+            stage3_result = predict_cytotoxicity_stage(data, stage1_result, stage2_result, mode)
+            key_factors = _key_factors(data, mode, material_toxicity=stage2_result.pop('_material_toxicity'))
+            results[i] = (mode, stage1_result, stage2_result, stage3_result, key_factors)
+    
+    return results
+
+# Built once at import; both run on every /contact and /share-dataset field
+_SANITIZE_TABLE = str.maketrans('', '', '<>"\'')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def sanitize_input(text):
     """Sanitize user input to prevent XSS"""
     if not text:
         return ""
     # Remove potentially dangerous characters
-    text = re.sub(r'[<>"\']', '', str(text))
-    return text.strip()
+    return str(text).translate(_SANITIZE_TABLE).strip()
 
 def is_valid_email(email):
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
+
+# Emails are sent off the request thread: /contact and /share-dataset validate,
+# queue the send and answer 202 immediately instead of waiting on SMTP.
+# Threads start on first submit, i.e. inside each gunicorn worker after fork.
+EMAIL_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='email')
+
+# The executor's own queue is unbounded; cap queued + in-flight sends per
+# worker so a flood of submissions is turned away (503) instead of piling up.
+EMAIL_QUEUE_LIMIT = 100
+_EMAIL_SLOTS = threading.BoundedSemaphore(EMAIL_QUEUE_LIMIT)
+
+def _queue_email(send, *args):
+    """Submit send(*args) to EMAIL_EXECUTOR; False if EMAIL_QUEUE_LIMIT sends are already pending"""
+    if not _EMAIL_SLOTS.acquire(blocking=False):
+        return False
+    EMAIL_EXECUTOR.submit(send, *args).add_done_callback(lambda _: _EMAIL_SLOTS.release())
+    return True
+
+# One logged-in SMTP connection shared by both senders, instead of a fresh
+# connect + TLS + login + quit per email. Guarded by a lock because smtplib
+# connections are not thread-safe. Every socket operation is bounded by
+# SMTP_TIMEOUT so a stalled mail server can't hold the lock indefinitely.
+_SMTP_LOCK = threading.Lock()
+_SMTP_CONN = None
+SMTP_TIMEOUT = 30  # seconds
+
+def _get_smtp(smtp_server, smtp_port, smtp_username, smtp_password):
+    """Return the shared SMTP connection, connecting and logging in on first use"""
+    import smtplib
+    global _SMTP_CONN
+    if _SMTP_CONN is None:
+        if smtp_port == 465:
+            # Use SSL for port 465
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=SMTP_TIMEOUT)
+        else:
+            # Use STARTTLS for other ports
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=SMTP_TIMEOUT)
+        try:
+            if smtp_port != 465:
+                server.starttls()
+            server.login(smtp_username, smtp_password)
+        except Exception:
+            server.close()
+            raise
+        _SMTP_CONN = server
+    return _SMTP_CONN
+
+def _send_email(smtp_server, smtp_port, smtp_username, smtp_password, to_addr, msg):
+    """Send msg over the shared connection, reconnecting once if the server dropped it"""
+    import smtplib
+    global _SMTP_CONN
+    text = msg.as_string()
+    with _SMTP_LOCK:
+        for attempt in range(2):
+            server = _get_smtp(smtp_server, smtp_port, smtp_username, smtp_password)
+            try:
+                server.sendmail(smtp_username, to_addr, text)
+                return
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                raise  # the server rejected this message; the connection is fine
+            except OSError:
+                # Disconnects, resets and timeouts (smtplib reports a read
+                # timeout as SMTPServerDisconnected) leave the socket unusable:
+                # drop it so the retry, or the next send, reconnects. Idle
+                # connections get closed by the mail server; start over once.
+                _SMTP_CONN = None
+                try:
+                    server.close()
+                except Exception:
+                    pass
+                if attempt:
+                    raise
 
 def send_contact_email(name, email, profession, phone, message):
     """Send contact form email"""
+    # Email modules are only needed once someone submits a form
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    
     try:
         # Email configuration
         smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -527,17 +789,7 @@ def send_contact_email(name, email, profession, phone, message):
         msg.attach(MIMEText(body, 'plain'))
         
         # Send email
-        if smtp_port == 465:
-            # Use SSL for port 465
-            server = smtplib.SMTP_SSL(smtp_server, smtp_port)
-        else:
-            # Use STARTTLS for other ports
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-        server.login(smtp_username, smtp_password)
-        text = msg.as_string()
-        server.sendmail(smtp_username, admin_email, text)
-        server.quit()
+        _send_email(smtp_server, smtp_port, smtp_username, smtp_password, admin_email, msg)
         
         print(f"SUCCESS: Contact email sent for {name}")
         return True
@@ -548,6 +800,10 @@ def send_contact_email(name, email, profession, phone, message):
 
 def send_dataset_sharing_email(name, email, organization, dataset_description, dataset_size, research_area):
     """Send dataset sharing email"""
+    # Email modules are only needed once someone submits a form
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    
     try:
         # Email configuration
         smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -585,17 +841,7 @@ def send_dataset_sharing_email(name, email, organization, dataset_description, d
         msg.attach(MIMEText(body, 'plain'))
         
         # Send email
-        if smtp_port == 465:
-            # Use SSL for port 465
-            server = smtplib.SMTP_SSL(smtp_server, smtp_port)
-        else:
-            # Use STARTTLS for other ports
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-        server.login(smtp_username, smtp_password)
-        text = msg.as_string()
-        server.sendmail(smtp_username, admin_email, text)
-        server.quit()
+        _send_email(smtp_server, smtp_port, smtp_username, smtp_password, admin_email, msg)
         
         print(f"SUCCESS: Dataset sharing email sent for {name}")
         return True
@@ -604,65 +850,310 @@ def send_dataset_sharing_email(name, email, organization, dataset_description, d
         print(f"ERROR: Dataset sharing email send error: {e}")
         return False
 
+def _key_factors(data, mode, feats=None, material_toxicity=None):
+    """Human-readable summary of the inputs that drove a prediction"""
+    if feats is None:
+        feats = _extract_features(data)
+    core_size, surface_area, _, _, _, ph, _, _ = feats
+    if material_toxicity is None:
+        material_toxicity = _material_tox(data['nanoparticle_id'])
+    
+    # Mode-specific key factors
+    if mode == "BIOLOGICAL_CONTEXT":
+        environmental_status = "FAVORABLE"
+        if ph is not None:
+            if ph < 6.0 or ph > 8.0:
+                environmental_status = "UNFAVORABLE"
+    else:
+        environmental_status = "N/A"
+    
+    return {
+        'material': f"{material_toxicity:.1%}",
+        'size_effect': f"{'HIGH' if core_size < 50 else 'MODERATE'}",
+        'surface_reactivity': f"{'HIGH' if surface_area > 100 else 'MODERATE'}",
+        'environmental': environmental_status
+    }
+
+# One dashboard log entry. A namedtuple is roughly a third of the size of the
+# same dict. The last three fields are the chart aggregate keys, derived once
+# in _new_record(); the history views return the others via _record_row()
+PredictionRecord = namedtuple('PredictionRecord', [
+    'timestamp', 'nanoparticle_id', 'toxicity', 'confidence',
+    'cytotoxicity', 'response_time_ms', 'key_factors', 'risk_level',
+    'day', 'is_toxic', 'np_type',
+])
+_ROW_FIELDS = PredictionRecord._fields[:8]
+
+def _new_record(timestamp, nanoparticle_id, toxicity, confidence,
+                cytotoxicity, response_time_ms, key_factors, risk_level):
+    """PredictionRecord with its day / is_toxic / np_type keys filled in"""
+    ts = timestamp or ''
+    return PredictionRecord(
+        timestamp, nanoparticle_id, toxicity, confidence,
+        cytotoxicity, response_time_ms, key_factors, risk_level,
+        ts[:10] if len(ts) >= 10 else ts,
+        (toxicity or '').upper() == 'TOXIC',
+        (nanoparticle_id or 'unknown').strip() or 'unknown',
+    )
+
+def _record_row(p):
+    """A log entry as the dict the history endpoints return"""
+    return dict(zip(_ROW_FIELDS, p))
+
+# Running aggregates over DASHBOARD_PREDICTIONS for the chart endpoints. They are
+# updated as entries are added and evicted, so a dashboard poll reads them
+# instead of rescanning the whole log. Writers and readers hold _DASHBOARD_LOCK.
+_DASHBOARD_LOCK = threading.Lock()
+_DASHBOARD_VERSION = 0          # bumped on every change to the log
+DAY_COUNTS = {}                 # day -> {'total': n, 'toxic': n, 'non_toxic': n}, kept in day order
+NP_TYPE_COUNTS = Counter()      # nanoparticle_id -> n
+TOXICITY_COUNTS = {'toxic': 0, 'non_toxic': 0}
+
+def _count_prediction(p, delta):
+    """Add (delta=1) or remove (delta=-1) one log entry from the aggregates"""
+    day = p.day
+    kind = 'toxic' if p.is_toxic else 'non_toxic'
+    nid = p.np_type
+    
+    bucket = DAY_COUNTS.get(day)
+    if bucket is None:
+        # Log timestamps only move forward, so a new day normally goes at the
+        # end; re-sort in the rare case one doesn't (clock change, reload)
+        in_order = not DAY_COUNTS or day > next(reversed(DAY_COUNTS))
+        bucket = DAY_COUNTS[day] = {'total': 0, 'toxic': 0, 'non_toxic': 0}
+        if not in_order:
+            days = sorted(DAY_COUNTS.items())
+            DAY_COUNTS.clear()
+            DAY_COUNTS.update(days)
+    bucket['total'] += delta
+    bucket[kind] += delta
+    if not bucket['total']:
+        del DAY_COUNTS[day]
+    
+    NP_TYPE_COUNTS[nid] += delta
+    if not NP_TYPE_COUNTS[nid]:
+        del NP_TYPE_COUNTS[nid]
+    
+    TOXICITY_COUNTS[kind] += delta
+
+def _append_prediction(record):
+    """Add a record to the dashboard log, keeping the aggregates in step"""
+    global _DASHBOARD_VERSION
+    with _DASHBOARD_LOCK:
+        if len(DASHBOARD_PREDICTIONS) == DASHBOARD_PREDICTIONS.maxlen:
+            _count_prediction(DASHBOARD_PREDICTIONS[0], -1)   # about to be evicted
+        DASHBOARD_PREDICTIONS.append(record)
+        _count_prediction(record, 1)
+        _DASHBOARD_VERSION += 1
+
+def _rebuild_aggregates():
+    """Recompute the aggregates from DASHBOARD_PREDICTIONS (e.g. after loading a saved log)"""
+    global _DASHBOARD_VERSION
+    with _DASHBOARD_LOCK:
+        # Count with Counter over generators (C loop) rather than per entry
+        totals = Counter(p.day for p in DASHBOARD_PREDICTIONS)
+        toxic = Counter(p.day for p in DASHBOARD_PREDICTIONS if p.is_toxic)
+        DAY_COUNTS.clear()
+        DAY_COUNTS.update(
+            (day, {'total': n, 'toxic': toxic[day], 'non_toxic': n - toxic[day]})
+            for day, n in sorted(totals.items()))
+        NP_TYPE_COUNTS.clear()
+        NP_TYPE_COUNTS.update(p.np_type for p in DASHBOARD_PREDICTIONS)
+        n_toxic = sum(toxic.values())
+        TOXICITY_COUNTS.update(toxic=n_toxic, non_toxic=len(DASHBOARD_PREDICTIONS) - n_toxic)
+        _DASHBOARD_VERSION += 1
+
+# Optional on-disk copy of the prediction log. Point DASHBOARD_DB_PATH at a
+# SQLite file to keep dashboard history across restarts (the newest entries
+# are loaded back at startup); unset, the log lives in memory only. Rows are
+# written on one background thread so /predict never waits on the disk.
+DASHBOARD_DB_PATH = os.environ.get('DASHBOARD_DB_PATH')
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dashboard-db')
+_db_conn = None                 # writer connection, only used on DB_EXECUTOR
+_db_writes = 0                  # rows written through _db_conn, for pruning
+# Only the newest DASHBOARD_PREDICTIONS.maxlen rows are ever read back, so
+# older ones are deleted every DB_PRUNE_EVERY writes to keep the file bounded
+DB_PRUNE_EVERY = 100
+
+def _db_connect():
+    """Open DASHBOARD_DB_PATH, creating the predictions table if needed"""
+    conn = sqlite3.connect(DASHBOARD_DB_PATH, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS predictions ('
+        'timestamp TEXT, nanoparticle_id TEXT, toxicity TEXT, confidence REAL, '
+        'cytotoxicity TEXT, response_time_ms REAL, key_factors TEXT, risk_level TEXT)')
+    return conn
+
+def _prune_saved_predictions(conn):
+    """Delete all but the newest DASHBOARD_PREDICTIONS.maxlen rows (rowid order)"""
+    conn.execute(
+        'DELETE FROM predictions WHERE rowid <= (SELECT MAX(rowid) FROM predictions) - ?',
+        (DASHBOARD_PREDICTIONS.maxlen,))
+
+def _save_prediction(record):
+    """Write one log entry to DASHBOARD_DB_PATH (runs on DB_EXECUTOR)"""
+    global _db_conn, _db_writes
+    try:
+        if _db_conn is None:
+            _db_conn = _db_connect()
+        with _db_conn:
+            _db_conn.execute(
+                'INSERT INTO predictions (timestamp, nanoparticle_id, toxicity, confidence, '
+                'cytotoxicity, response_time_ms, key_factors, risk_level) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (record.timestamp, record.nanoparticle_id, record.toxicity,
+                 record.confidence, record.cytotoxicity, record.response_time_ms,
+                 json.dumps(record.key_factors, default=str), record.risk_level))
+            _db_writes += 1
+            if _db_writes % DB_PRUNE_EVERY == 0:
+                _prune_saved_predictions(_db_conn)
+    except sqlite3.Error as e:
+        print(f"WARNING: Could not save prediction to {DASHBOARD_DB_PATH}: {e}")
+
+def _load_saved_predictions():
+    """Fill DASHBOARD_PREDICTIONS with the newest saved entries and rebuild the aggregates"""
+    try:
+        conn = _db_connect()
+        try:
+            with conn:
+                _prune_saved_predictions(conn)
+            rows = conn.execute(
+                'SELECT timestamp, nanoparticle_id, toxicity, confidence, cytotoxicity, '
+                'response_time_ms, key_factors, risk_level '
+                'FROM predictions ORDER BY rowid DESC LIMIT ?',
+                (DASHBOARD_PREDICTIONS.maxlen,)).fetchall()
+        finally:
+            conn.close()   # workers open their own writer after the fork
+    except sqlite3.Error as e:
+        print(f"WARNING: Could not load saved predictions from {DASHBOARD_DB_PATH}: {e}")
+        return
+    
+    with _DASHBOARD_LOCK:
+        DASHBOARD_PREDICTIONS.clear()
+        DASHBOARD_PREDICTIONS.extend(
+            _new_record(ts, nid, tox, conf, cyto, rt_ms, json.loads(kf) if kf else {}, risk)
+            for ts, nid, tox, conf, cyto, rt_ms, kf, risk in reversed(rows))
+    _rebuild_aggregates()
+    print(f"INFO: Loaded {len(rows)} saved predictions from {DASHBOARD_DB_PATH}")
+
+def _log_prediction(data, stage2_result, stage3_result, key_factors, response_time_ms):
+    """Append one prediction to the dashboard log"""
+    record = _new_record(
+        _iso_now(),
+        data['nanoparticle_id'],
+        stage2_result['toxicity_prediction'],
+        stage2_result.get('confidence'),
+        stage3_result.get('cytotoxicity'),
+        round(response_time_ms, 2),
+        key_factors,
+        stage2_result.get('risk_level'),
+    )
+    _append_prediction(record)
+    if DASHBOARD_DB_PATH:
+        DB_EXECUTOR.submit(_save_prediction, record)
+
+if DASHBOARD_DB_PATH:
+    _load_saved_predictions()
+
+REQUIRED_PREDICT_FIELDS = ('nanoparticle_id', 'core_size', 'zeta_potential', 'surface_area', 'dosage')
+
+def _validate_predict_body(data):
+    """Error message for a /predict body the pipeline can't score, or None"""
+    if not isinstance(data, dict):
+        return 'Expected a JSON object'
+    missing = [field for field in REQUIRED_PREDICT_FIELDS if data.get(field) is None]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    if not isinstance(data['nanoparticle_id'], str):
+        return 'nanoparticle_id must be a string'
+    return None
+
+def _run_pipeline(data):
+    """Stages 1-3 plus key factors for one /predict body"""
+    
+    # Detect mode based on provided parameters
+    mode = detect_prediction_mode(data)
+    print(f"INFO: Running {mode} ML pipeline for: {data['nanoparticle_id']}")
+    feats = _extract_features(data)
+    
+    # Stage 1: Aggregation (mode-specific)
+    print(f"INFO: Stage 1: {mode} aggregation prediction...")
+    stage1_result = predict_aggregation_stage(data, mode, feats)
+    
+    # Stage 2: Toxicity (mode-specific)
+    print(f"INFO: Stage 2: {mode} toxicity prediction...")
+    stage2_result = predict_toxicity_stage(data, stage1_result, mode, feats)
+    
+    # Stage 3: Cytotoxicity (mode-specific)
+    print(f"INFO: Stage 3: {mode} cytotoxicity prediction...")
+    stage3_result = predict_cytotoxicity_stage(data, stage1_result, stage2_result, mode)
+    
+    # Enhanced key factors summary
+    material_toxicity = stage2_result.pop('_material_toxicity')
+    key_factors = _key_factors(data, mode, feats, material_toxicity)
+    
+    return mode, stage1_result, stage2_result, stage3_result, key_factors
+
+# ----- /predict result cache (LRU, keyed by a digest of the canonical body) -----
+PREDICTION_CACHE_SIZE = 4096
+_PREDICTION_CACHE = OrderedDict()
+_PREDICTION_CACHE_LOCK = threading.Lock()
+
+def _prediction_cache_key(data):
+    return hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=16).digest()
+
+def _prediction_cache_get(key):
+    with _PREDICTION_CACHE_LOCK:
+        result = _PREDICTION_CACHE.get(key)
+        if result is None:
+            return None
+        _PREDICTION_CACHE.move_to_end(key)
+    # Stage results are flat dicts of str/float, so copying each dict is a deep
+    # copy; the caller can't change what later hits return
+    mode, *parts = result
+    return (mode, *(dict(part) for part in parts))
+
+def _prediction_cache_put(key, result):
+    with _PREDICTION_CACHE_LOCK:
+        _PREDICTION_CACHE[key] = result
+        _PREDICTION_CACHE.move_to_end(key)
+        if len(_PREDICTION_CACHE) > PREDICTION_CACHE_SIZE:
+            _PREDICTION_CACHE.popitem(last=False)
+
+# The docs page has no template variables; encode it once instead of running
+# it through Jinja on every hit, and let browsers/CDNs cache it for a day
+_INDEX_HTML = HTML_TEMPLATE.encode('utf-8')
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return app.response_class(_INDEX_HTML, mimetype='text/html',
+                              headers={'Cache-Control': 'public, max-age=86400'})
 
 @app.route('/predict', methods=['POST'])
 def predict_toxicity():
     """Run the complete enhanced 3-stage ML pipeline with dual-mode support"""
     
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Detect mode based on provided parameters
-        mode = detect_prediction_mode(data)
-        print(f"INFO: Running {mode} ML pipeline for: {data['nanoparticle_id']}")
-        
-        # Stage 1: Aggregation (mode-specific)
-        print(f"INFO: Stage 1: {mode} aggregation prediction...")
-        stage1_result = predict_aggregation_stage(data, mode)
-        
-        # Stage 2: Toxicity (mode-specific)
-        print(f"INFO: Stage 2: {mode} toxicity prediction...")
-        stage2_result = predict_toxicity_stage(data, stage1_result, mode)
-        
-        # Stage 3: Cytotoxicity (mode-specific)
-        print(f"INFO: Stage 3: {mode} cytotoxicity prediction...")
-        stage3_result = predict_cytotoxicity_stage(data, stage1_result, stage2_result, mode)
-        
-        # Enhanced key factors summary
-        material_toxicity = 0.0
-        if 'CuO' in data['nanoparticle_id']:
-            material_toxicity = 0.9
-        elif 'NiO' in data['nanoparticle_id']:
-            material_toxicity = 0.8
-        elif 'ZnO' in data['nanoparticle_id']:
-            material_toxicity = 0.8
-        elif 'SiO2' in data['nanoparticle_id']:
-            material_toxicity = 0.1
-        elif 'CeO2' in data['nanoparticle_id']:
-            material_toxicity = 0.2
-        
-        # Mode-specific key factors
-        if mode == "BIOLOGICAL_CONTEXT":
-            environmental_status = "FAVORABLE"
-            if 'environmental_pH' in data and data['environmental_pH'] is not None:
-                ph = data['environmental_pH']
-                if ph < 6.0 or ph > 8.0:
-                    environmental_status = "UNFAVORABLE"
-        else:
-            environmental_status = "N/A"
+        # Reject malformed bodies before running any stage
+        error = _validate_predict_body(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        key_factors = {
-            'material': f"{material_toxicity:.1%}",
-            'size_effect': f"{'HIGH' if data['core_size'] < 50 else 'MODERATE'}",
-            'surface_reactivity': f"{'HIGH' if data['surface_area'] > 100 else 'MODERATE'}",
-            'environmental': environmental_status
-        }
+        # Identical bodies give identical results, so repeats come from the cache
+        use_cache = request.headers.get('X-No-Cache') != '1'
+        cache_key = _prediction_cache_key(data) if use_cache else None
+        result = _prediction_cache_get(cache_key) if use_cache else None
+        if result is None:
+            result = _run_pipeline(data)
+            if use_cache:
+                _prediction_cache_put(cache_key, result)
+        mode, stage1_result, stage2_result, stage3_result, key_factors = result
         
         response_time_ms = (time.time() - getattr(g, "start_time", time.time())) * 1000
         payload = {
@@ -675,17 +1166,7 @@ def predict_toxicity():
             'key_factors': key_factors
         }
         # Log for dashboard
-        DASHBOARD_PREDICTIONS.append({
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'nanoparticle_id': data['nanoparticle_id'],
-            'toxicity': stage2_result['toxicity_prediction'],
-            'confidence': stage2_result.get('confidence'),
-            'cytotoxicity': stage3_result.get('cytotoxicity'),
-            'response_time_ms': round(response_time_ms, 2),
-            'key_factors': key_factors,
-            'risk_level': stage2_result.get('risk_level'),
-        })
-        _limit_list(DASHBOARD_PREDICTIONS, 2000)
+        _log_prediction(data, stage2_result, stage3_result, key_factors, response_time_ms)
         
         return jsonify(payload)
         
@@ -693,6 +1174,49 @@ def predict_toxicity():
         print(f"Enhanced pipeline error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_toxicity_batch():
+    """Run the 3-stage pipeline over a JSON list of /predict bodies in one pass"""
+    
+    try:
+        records = request.get_json(silent=True)
+        
+        if not records:
+            return jsonify({'error': 'No data provided'}), 400
+        if not isinstance(records, list):
+            return jsonify({'error': 'Expected a JSON list of prediction objects'}), 400
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} records per batch'}), 400
+        for i, data in enumerate(records):
+            error = _validate_predict_body(data)
+            if error:
+                return jsonify({'error': f'Record {i}: {error}'}), 400
+        
+        print(f"INFO: Running batch ML pipeline for {len(records)} records")
+        g.prediction_count = len(records)
+        results = []
+        for data, (mode, stage1_result, stage2_result, stage3_result, key_factors) in zip(records, predict_batch_stages(records)):
+            results.append({
+                'success': True,
+                'mode': mode,
+                'nanoparticle_id': data['nanoparticle_id'],
+                'stage1': stage1_result,
+                'stage2': stage2_result,
+                'stage3': stage3_result,
+                'key_factors': key_factors
+            })
+        
+        # Log for dashboard, spreading the batch time evenly over its records
+        response_time_ms = (time.time() - getattr(g, "start_time", time.time())) * 1000 / len(records)
+        for data, result in zip(records, results):
+            _log_prediction(data, result['stage2'], result['stage3'], result['key_factors'], response_time_ms)
+        
+        return jsonify({'success': True, 'count': len(results), 'results': results})
+        
+    except Exception as e:
+        print(f"Batch pipeline error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/contact', methods=['POST'])
 def contact_us():
     """Handle contact form submissions and send emails"""
@@ -720,28 +1244,25 @@ def contact_us():
         if not is_valid_email(email):
             return jsonify({'success': False, 'message': 'Invalid email format'}), 400
         
-        # Send email
-        success = send_contact_email(name, email, profession, phone, message)
-        
-        if success:
-            DASHBOARD_CONTACTS.append({
-                'timestamp': datetime.utcnow().isoformat() + 'Z',
-                'name': name,
-                'email': email,
-                'profession': profession,
-                'phone': phone,
-                'message': message[:500],
-            })
-            _limit_list(DASHBOARD_CONTACTS, 500)
-            return jsonify({
-                'success': True, 
-                'message': 'Your request has been sent successfully. We will contact you shortly.'
-            })
-        else:
+        # Send email in the background (failures are logged by the sender)
+        if not _queue_email(send_contact_email, name, email, profession, phone, message):
             return jsonify({
-                'success': False, 
-                'message': 'Failed to send message. Please try again later.'
-            })
+                'success': False,
+                'message': 'Too many pending requests. Please try again in a few minutes.'
+            }), 503
+        
+        DASHBOARD_CONTACTS.append({
+            'timestamp': _iso_now(),
+            'name': name,
+            'email': email,
+            'profession': profession,
+            'phone': phone,
+            'message': message[:500],
+        })
+        return jsonify({
+            'success': True, 
+            'message': 'Your request has been received and queued for delivery. We will contact you shortly.'
+        }), 202
             
     except Exception as e:
         print(f"Contact form error: {str(e)}")
@@ -775,29 +1296,27 @@ def share_dataset():
         if not is_valid_email(email):
             return jsonify({'success': False, 'message': 'Invalid email format'}), 400
         
-        # Send dataset sharing email
-        success = send_dataset_sharing_email(name, email, organization, dataset_description, dataset_size, research_area)
-        
-        if success:
-            DASHBOARD_DATASETS.append({
-                'timestamp': datetime.utcnow().isoformat() + 'Z',
-                'name': name,
-                'email': email,
-                'organization': organization,
-                'dataset_description': dataset_description[:1000],
-                'dataset_size': dataset_size,
-                'research_area': research_area,
-            })
-            _limit_list(DASHBOARD_DATASETS, 500)
-            return jsonify({
-                'success': True, 
-                'message': 'Your dataset sharing request has been sent successfully. We will review and contact you shortly.'
-            })
-        else:
+        # Send dataset sharing email in the background (failures are logged by the sender)
+        if not _queue_email(send_dataset_sharing_email, name, email, organization,
+                            dataset_description, dataset_size, research_area):
             return jsonify({
-                'success': False, 
-                'message': 'Failed to send dataset sharing request. Please try again later.'
-            })
+                'success': False,
+                'message': 'Too many pending requests. Please try again in a few minutes.'
+            }), 503
+        
+        DASHBOARD_DATASETS.append({
+            'timestamp': _iso_now(),
+            'name': name,
+            'email': email,
+            'organization': organization,
+            'dataset_description': dataset_description[:1000],
+            'dataset_size': dataset_size,
+            'research_area': research_area,
+        })
+        return jsonify({
+            'success': True, 
+            'message': 'Your dataset sharing request has been received and queued for delivery. We will review and contact you shortly.'
+        }), 202
             
     except Exception as e:
         print(f"Dataset sharing error: {str(e)}")
@@ -816,7 +1335,7 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'NanoTox AI API is running',
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'timestamp': _iso_now(),
         'uptime_seconds': round(uptime_seconds, 1),
         'uptime_percentage': 100.0,  # Frontend can derive from uptime_seconds vs deploy time if needed
         'models_loaded': models_loaded,
@@ -836,102 +1355,159 @@ def ping():
 
 # ----- Dashboard API (for frontend metrics) -----
 
+# Serialized responses of the prediction-derived endpoints, keyed by path and
+# query string. Frontends poll these far more often than predictions arrive,
+# so an entry is reused until _DASHBOARD_VERSION moves on. The version is also
+# the ETag, so a poll that sends If-None-Match gets an empty 304 instead.
+DASHBOARD_CACHE_SIZE = 256
+_DASHBOARD_CACHE = {}           # full path -> (version, body bytes)
+# Versions restart at 0 with the process and differ between workers, so the
+# ETag also carries the start time and worker pid
+_ETAG_PREFIX = f'{time.time_ns():x}'
+
+def _dashboard_cached(view):
+    """Serve a dashboard view from _DASHBOARD_CACHE while the prediction log is unchanged"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.full_path
+        # Read before building: if a prediction lands mid-build, the entry is
+        # filed under the older version and the next poll rebuilds it
+        version = _DASHBOARD_VERSION
+        etag = f'{_ETAG_PREFIX}.{os.getpid():x}.{version}'
+        if etag in request.if_none_match:
+            response = app.response_class(status=304)
+        else:
+            cached = _DASHBOARD_CACHE.get(key)
+            if cached is not None and cached[0] == version:
+                response = app.response_class(cached[1], mimetype='application/json')
+            else:
+                response = view(*args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                if len(_DASHBOARD_CACHE) >= DASHBOARD_CACHE_SIZE:
+                    _DASHBOARD_CACHE.clear()
+                _DASHBOARD_CACHE[key] = (version, response.get_data())
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'   # always revalidate
+        return response
+    return wrapper
+
+def _int_arg(name, default, lo, hi=None):
+    """Integer query parameter clamped to [lo, hi]; missing or non-numeric values give default"""
+    value = request.args.get(name, default, type=int)
+    if value < lo:
+        return lo
+    if hi is not None and value > hi:
+        return hi
+    return value
+
 @app.route('/api/dashboard/stats', methods=['GET'])
 def dashboard_stats():
     """Total predictions, average response time, growth hint. For KPI cards."""
+    # total_predictions is this worker's log; the request stats are server-wide
+    # (they differ only with several workers, see DASHBOARD_API.md)
     total = len(DASHBOARD_PREDICTIONS)
-    times = list(PREDICTION_RESPONSE_TIMES_MS)
-    avg_ms = round(sum(times) / len(times), 2) if times else 0
+    success, fail, times = _prediction_request_stats()
+    avg_ms = round(float(times.mean()), 2) if times.size else 0
     return jsonify({
         'total_predictions': total,
         'average_response_time_ms': avg_ms,
-        'prediction_success_count': PREDICTION_REQUEST_SUCCESS,
-        'prediction_fail_count': PREDICTION_REQUEST_FAIL,
+        'prediction_success_count': success,
+        'prediction_fail_count': fail,
     })
 
 
 @app.route('/api/dashboard/predictions-over-time', methods=['GET'])
+@_dashboard_cached
 def dashboard_predictions_over_time():
     """Counts by day (and optionally toxic vs non-toxic). For line/bar charts."""
-    by_day = defaultdict(lambda: {'total': 0, 'toxic': 0, 'non_toxic': 0})
-    for p in DASHBOARD_PREDICTIONS:
-        ts = p.get('timestamp') or ''
-        day = ts[:10] if len(ts) >= 10 else ts
-        by_day[day]['total'] += 1
-        if (p.get('toxicity') or '').upper() == 'TOXIC':
-            by_day[day]['toxic'] += 1
-        else:
-            by_day[day]['non_toxic'] += 1
-    series = [{'date': k, **v} for k, v in sorted(by_day.items())]
+    with _DASHBOARD_LOCK:
+        series = [{'date': k, **v} for k, v in DAY_COUNTS.items()]
     return jsonify({'series': series})
 
 
 @app.route('/api/dashboard/request-stats', methods=['GET'])
 def dashboard_request_stats():
     """Success vs failed prediction requests. For pie/donut chart."""
-    total = PREDICTION_REQUEST_SUCCESS + PREDICTION_REQUEST_FAIL
+    success, fail, _ = _prediction_request_stats()
     return jsonify({
-        'success': PREDICTION_REQUEST_SUCCESS,
-        'failed': PREDICTION_REQUEST_FAIL,
-        'total': total,
+        'success': success,
+        'failed': fail,
+        'total': success + fail,
     })
 
 
 @app.route('/api/dashboard/contact-requests', methods=['GET'])
 def dashboard_contact_requests():
-    """Contact form submissions. For table."""
-    return jsonify({'requests': list(reversed(DASHBOARD_CONTACTS))})
+    """Contact form submissions (optional ?limit=N newest). For table."""
+    limit = request.args.get('limit', type=int)
+    items = islice(reversed(DASHBOARD_CONTACTS), limit if limit and limit > 0 else None)
+    return jsonify({'requests': list(items)})
 
 
 @app.route('/api/dashboard/dataset-requests', methods=['GET'])
 def dashboard_dataset_requests():
-    """Dataset share submissions. For table."""
-    return jsonify({'requests': list(reversed(DASHBOARD_DATASETS))})
+    """Dataset share submissions (optional ?limit=N newest). For table."""
+    limit = request.args.get('limit', type=int)
+    items = islice(reversed(DASHBOARD_DATASETS), limit if limit and limit > 0 else None)
+    return jsonify({'requests': list(items)})
 
 
 @app.route('/api/dashboard/nanoparticle-types', methods=['GET'])
+@_dashboard_cached
 def dashboard_nanoparticle_types():
     """Count by nanoparticle type. For bar chart (optional)."""
-    counts = defaultdict(int)
-    for p in DASHBOARD_PREDICTIONS:
-        nid = (p.get('nanoparticle_id') or 'unknown').strip() or 'unknown'
-        counts[nid] += 1
-    series = [{'nanoparticle_id': k, 'count': v} for k, v in sorted(counts.items(), key=lambda x: -x[1])]
+    with _DASHBOARD_LOCK:
+        counts = NP_TYPE_COUNTS.most_common()
+    series = [{'nanoparticle_id': k, 'count': v} for k, v in counts]
     return jsonify({'series': series})
 
 
 @app.route('/api/dashboard/recent-predictions', methods=['GET'])
+@_dashboard_cached
 def dashboard_recent_predictions():
     """Last N predictions. For table and toxicity KPI."""
-    limit = min(int(request.args.get('limit', 20)), 100)
-    recent = list(reversed(DASHBOARD_PREDICTIONS[-limit:]))
+    limit = _int_arg('limit', 20, 0, 100)
+    # Walk back from the newest entry; only the returned rows are touched.
+    # Copy them under the lock so a concurrent append can't mutate the deque
+    # mid-iteration, and build the dicts after releasing it.
+    with _DASHBOARD_LOCK:
+        rows = list(islice(reversed(DASHBOARD_PREDICTIONS), limit))
+    recent = [_record_row(p) for p in rows]
     return jsonify({'predictions': recent})
 
 
 @app.route('/api/dashboard/prediction-history', methods=['GET'])
+@_dashboard_cached
 def dashboard_prediction_history():
     """Full prediction history (paginated). For table and detail panel."""
-    limit = min(int(request.args.get('limit', 50)), 200)
-    offset = max(0, int(request.args.get('offset', 0)))
-    all_p = list(reversed(DASHBOARD_PREDICTIONS))
-    page = all_p[offset : offset + limit]
+    limit = _int_arg('limit', 50, 0, 200)
+    offset = _int_arg('offset', 0, 0, DASHBOARD_PREDICTIONS.maxlen)
+    # Page newest-first without materializing the reversed log; the slice is
+    # copied under the lock (see dashboard_recent_predictions)
+    with _DASHBOARD_LOCK:
+        rows = list(islice(reversed(DASHBOARD_PREDICTIONS), offset, offset + limit))
+        total = len(DASHBOARD_PREDICTIONS)
+    page = [_record_row(p) for p in rows]
     return jsonify({
         'predictions': page,
-        'total': len(DASHBOARD_PREDICTIONS),
+        'total': total,
         'offset': offset,
         'limit': limit,
     })
 
 
 @app.route('/api/dashboard/toxicity-distribution', methods=['GET'])
+@_dashboard_cached
 def dashboard_toxicity_distribution():
     """Toxic vs non-toxic counts. For pie/bar chart."""
-    toxic = sum(1 for p in DASHBOARD_PREDICTIONS if (p.get('toxicity') or '').upper() == 'TOXIC')
-    non_toxic = len(DASHBOARD_PREDICTIONS) - toxic
+    with _DASHBOARD_LOCK:
+        toxic = TOXICITY_COUNTS['toxic']
+        non_toxic = TOXICITY_COUNTS['non_toxic']
     return jsonify({
         'toxic': toxic,
         'non_toxic': non_toxic,
-        'total': len(DASHBOARD_PREDICTIONS),
+        'total': toxic + non_toxic,
     })
 
 
@@ -945,5 +1521,6 @@ if __name__ == '__main__':
     # Get port from environment variable (for Railway)
     port = int(os.environ.get('PORT', 5000))
     
-    # Start server
+    # Start the development server (local use only; production runs under
+    # gunicorn, see gunicorn.conf.py)
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file